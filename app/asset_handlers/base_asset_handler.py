@@ -3,18 +3,19 @@
 import logging
 import requests
 from app.utils import get_headers
+from app.entity_cache import entity_cache
+from app.openmetadata_client import openmetadata_client
 
 logger = logging.getLogger(__name__)
 
 class BaseAssetHandler:
-# app/asset_handlers/base_asset_handler.py
-    OPENMETADATA_API_URL = "http://localhost:8585/api/v1"  # Adjust this URL as necessary
-
-    def __init__(self, db, asset_data, current_user):
+    def __init__(self, db, asset_data, current_user, headers=None):
         self.db = db
         self.asset_data = asset_data
         self.current_user = current_user
-        self.headers = get_headers(self.db)
+        self.client = openmetadata_client
+        # Callers may pass pre-resolved headers so the handler never touches the DB session
+        self.headers = headers if headers is not None else get_headers(self.db)
 
 
     def handle(self):
@@ -31,13 +32,11 @@ class BaseAssetHandler:
         Claims ownership of an asset if it is unowned.
         This logic is shared across asset types.
         """
-        asset_url = f"{self.OPENMETADATA_API_URL}/{self.asset_type}/{asset_id}"
+        asset_path = f"/{self.asset_type}/{asset_id}"
 
         try:
-            # Check current ownership of the asset
-            response = requests.get(asset_url, headers=self.headers)
-            response.raise_for_status()
-            asset_data = response.json()
+            # Check current ownership of the asset; ownership decisions always revalidate the cached entity
+            asset_data = entity_cache.get(self.asset_type, asset_id, self.headers, revalidate=True)
             asset_owners = asset_data.get("owners", [])
 
             # Check if the asset is unowned
@@ -59,7 +58,8 @@ class BaseAssetHandler:
             }
             claim_headers = self.headers.copy()
             claim_headers["Content-Type"] = "application/json-patch+json"
-            claim_response = requests.patch(asset_url, json=[payload], headers=claim_headers)
+            claim_response = self.client.patch(asset_path, json=[payload], headers=claim_headers)
+            entity_cache.invalidate(self.asset_type, asset_id)
             claim_response.raise_for_status()
 
             logger.info(f"User {self.current_user.id} claimed asset {asset_id}")
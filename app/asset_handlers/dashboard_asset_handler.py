@@ -2,18 +2,16 @@
 
 from app.asset_handlers.base_asset_handler import BaseAssetHandler
 from app.utils import (
-    get_headers,
     generate_valid_name,
     get_team_details
 )
 import logging
-import requests
 
 logger = logging.getLogger(__name__)
 
 class DashboardAssetHandler(BaseAssetHandler):
-    def __init__(self, db, asset_data, current_user):
-        super().__init__(db, asset_data, current_user)
+    def __init__(self, db, asset_data, current_user, headers=None):
+        super().__init__(db, asset_data, current_user, headers=headers)
         self.asset_type = "dashboards"  # Define the asset type here
 
     # Implement or override methods as needed
@@ -45,8 +43,7 @@ class DashboardAssetHandler(BaseAssetHandler):
 
     def ingest_asset(self):
         # Make the API request to ingest the asset
-        url = f"{self.OPENMETADATA_API_URL}/dashboards"
-        response = requests.post(url, json=self.payload, headers=self.headers)
+        response = self.client.post("/dashboards", json=self.payload, headers=self.headers)
         if response.status_code not in [200, 201]:
             raise Exception(f"Failed to create dashboard. Status Code: {response.status_code}, Response: {response.text}")
         logger.info(f"Dashboard '{self.asset_name}' created successfully.")
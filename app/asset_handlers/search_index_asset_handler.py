@@ -1,15 +1,12 @@
 # app/asset_handlers/search_index_asset_handler.py
 
 import logging
-import requests
 from app.asset_handlers.base_asset_handler import BaseAssetHandler
 from app.utils import generate_valid_name
 
 logger = logging.getLogger(__name__)
 
 class SearchIndexAssetHandler(BaseAssetHandler):
-    OPENMETADATA_API_URL = "http://localhost:8585/api/v1"  # Adjust as necessary
-
     DEFAULT_SEARCH_SERVICE_NAME = "default_search_service"
 
     def validate_asset_data(self):
@@ -53,8 +50,7 @@ class SearchIndexAssetHandler(BaseAssetHandler):
 
     def ingest_asset(self):
         # Make the API request to ingest the asset
-        url = f"{self.OPENMETADATA_API_URL}/searchIndexes"
-        response = requests.post(url, json=self.payload, headers=self.headers)
+        response = self.client.post("/searchIndexes", json=self.payload, headers=self.headers)
         if response.status_code not in [200, 201]:
             raise Exception(f"Failed to create search index. Status Code: {response.status_code}, Response: {response.text}")
         logger.info(f"SearchIndex '{self.asset_name}' created successfully.")
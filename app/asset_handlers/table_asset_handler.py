@@ -1,29 +1,42 @@
 from app.asset_handlers.base_asset_handler import BaseAssetHandler
+from app.entity_cache import entity_cache
+from app.ingestion_fingerprints import load_fingerprints, table_fingerprint
 from app.utils import (
-    get_headers, 
     get_or_create_database_service, 
     get_or_create_database, 
     get_or_create_schema,
     generate_valid_name,
-    get_team_details
+    get_team_details,
+    invalidate_hierarchy_cache
 )
-from app.config import settings
 import logging
 import requests
 
 logger = logging.getLogger(__name__)
 
 class TableAssetHandler(BaseAssetHandler):
-    def __init__(self, db, asset_data, current_user):
-        super().__init__(db, asset_data, current_user)
+    def __init__(self, db, asset_data, current_user, headers=None, force=False, known_fingerprints=None):
+        super().__init__(db, asset_data, current_user, headers=headers)
         self.asset_type = "tables"
-        self.OPENMETADATA_API_URL = settings.OPENMETADATA_API_URL
-        self.headers = get_headers(self.db)
+        # Write the table even when it is unchanged since its last upload
+        self.force = force
+        # Fingerprints preloaded by the caller (fqn -> hash); when None they are read from the DB session
+        self.known_fingerprints = known_fingerprints
 
         # Log to confirm initialization values
-        logger.debug(f"Initialized TableAssetHandler with API URL: {self.OPENMETADATA_API_URL}")
+        logger.debug(f"Initialized TableAssetHandler with API URL: {self.client.base_url}")
         logger.debug(f"Headers: {self.headers}")
 
+    @staticmethod
+    def table_fqn(asset_data, name=None):
+        """Fully qualified name the table of asset_data is written under."""
+        return ".".join([
+            asset_data.get("service_name", "default_service"),
+            asset_data.get("database_name", "default_database"),
+            asset_data.get("schema_name", "default_schema"),
+            name or generate_valid_name(asset_data["title"]),
+        ])
+
     def handle(self):
         created_assets = []
         errors = []
@@ -35,6 +48,32 @@ class TableAssetHandler(BaseAssetHandler):
 
         logger.debug(f"Handling asset creation for: service_name={database_service_name}, database_name={database_name}, schema_name={schema_name}")
 
+        # Construct the full payload for creating or updating the table
+        columns = self._construct_columns()
+        if not columns:
+            logger.warning("No valid columns were constructed for this asset.")
+
+        table_payload = {
+            "name": generate_valid_name(self.asset_data["title"]),
+            "displayName": self.asset_data["title"],
+            "description": self.asset_data.get("description", ""),
+            "columns": columns,
+            "databaseSchema": f"{database_service_name}.{database_name}.{schema_name}",
+            "owners": self._get_owners(),
+        }
+
+        # Log the final payload before making the API request
+        logger.info(f"Final payload for table creation/update: {table_payload}")
+
+        # Skip every upstream call when the table is unchanged since its last successful upload
+        table_fqn = self.table_fqn(self.asset_data, table_payload["name"])
+        fingerprint = table_fingerprint(table_payload)
+        if not self.force:
+            known = self.known_fingerprints if self.known_fingerprints is not None else load_fingerprints(self.db, [table_fqn])
+            if known.get(table_fqn) == fingerprint:
+                logger.info(f"Table '{table_fqn}' is unchanged since its last upload; skipping it.")
+                return {"success": True, "skipped": True, "created_assets": []}
+
         # Ensure the parent hierarchy is created or retrieved
         database_service = get_or_create_database_service(database_service_name, self.headers)
         if not database_service or 'error' in database_service:
@@ -57,45 +96,37 @@ class TableAssetHandler(BaseAssetHandler):
             logger.error(error_msg)
             return {"success": False, "errors": errors}
 
-        # Construct the full payload for creating or updating the table
-        columns = self._construct_columns()
-        if not columns:
-            logger.warning("No valid columns were constructed for this asset.")
-
-        table_payload = {
-            "name": generate_valid_name(self.asset_data["title"]),
-            "displayName": self.asset_data["title"],
-            "description": self.asset_data.get("description", ""),
-            "columns": columns,
-            "databaseSchema": f"{database_service_name}.{database_name}.{schema_name}",
-            "owners": self._get_owners(),
-        }
-
-        # Log the final payload before making the API request
-        logger.info(f"Final payload for table creation/update: {table_payload}")
-
         # Check if the table already exists
-        table_fqn = f"{database_service_name}.{database_name}.{schema_name}.{table_payload['name']}"
         logger.debug(f"Checking if table exists with FQN: {table_fqn}")
         existing_table = self._check_existing_table(table_fqn)
 
         try:
             if existing_table:
                 logger.info(f"Table '{self.asset_data['title']}' already exists, updating it with PUT.")
-                response = requests.put(f"{self.OPENMETADATA_API_URL}/tables", json=table_payload, headers=self.headers)
+                response = self.client.put("/tables", json=table_payload, headers=self.headers)
+                entity_cache.invalidate("tables", existing_table.get("id"))
             else:
                 logger.info(f"Table '{self.asset_data['title']}' does not exist, creating it with POST.")
-                response = requests.post(f"{self.OPENMETADATA_API_URL}/tables", json=table_payload, headers=self.headers)
+                response = self.client.post("/tables", json=table_payload, headers=self.headers)
 
             response.raise_for_status()
-            created_assets.append(response.json())
+            table = response.json()
+            created_assets.append(table)
             logger.info(f"Table '{self.asset_data['title']}' processed successfully.")
-            return {"success": True, "created_assets": created_assets}
+            # Callers persist the fingerprint once the write is known to have succeeded
+            return {
+                "success": True,
+                "created_assets": created_assets,
+                "fingerprint": {"fqn": table_fqn, "fingerprint": fingerprint, "table_id": table.get("id")},
+            }
 
         except requests.RequestException as e:
             error_msg = f"Failed to process table '{self.asset_data['title']}': {str(e)}"
             if e.response is not None:
                 error_msg += f", Response content: {e.response.text}"
+                if e.response.status_code == 404:
+                    # The cached parent schema may have been deleted upstream
+                    invalidate_hierarchy_cache(table_payload["databaseSchema"])
             errors.append(error_msg)
             logger.error(error_msg)
             return {"success": False, "errors": errors}
@@ -141,8 +172,8 @@ class TableAssetHandler(BaseAssetHandler):
     def _check_existing_table(self, table_fqn):
         """Checks if a table with the specified fully qualified name already exists."""
         try:
-            response = requests.get(f"{self.OPENMETADATA_API_URL}/tables/name/{table_fqn}", headers=self.headers)
-            logger.debug(f"GET request to check existing table at URL: {self.OPENMETADATA_API_URL}/tables/name/{table_fqn}")
+            response = self.client.get(f"/tables/name/{table_fqn}", headers=self.headers)
+            logger.debug(f"GET request to check existing table at URL: {self.client.url(f'/tables/name/{table_fqn}')}")
             logger.debug(f"Response status code: {response.status_code}")
             logger.debug(f"Response text: {response.text}")
 
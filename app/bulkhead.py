@@ -0,0 +1,148 @@
+# app/bulkhead.py
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional
+import anyio
+import requests
+from fastapi import HTTPException
+from app.config import settings
+from app.metrics import register_metrics
+
+INTERACTIVE = "interactive"
+BULK = "bulk"
+
+class UpstreamOverloaded(requests.RequestException):
+    """An upstream call was shed because its lane's queue was full or the wait took too long."""
+
+class Lane:
+    """
+    Bounded share of upstream concurrency: at most `limit` calls in flight and `max_queue`
+    callers waiting for a slot; anything beyond that is rejected instead of queued.
+    """
+
+    def __init__(self, name: str, limit: int, max_queue: int):
+        self.name = name
+        self.limit = limit
+        self.max_queue = max_queue
+        self._slots = threading.BoundedSemaphore(limit)
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def admit(self) -> bool:
+        """Whether new work may join this lane; counts a rejection when its queue is full."""
+        with self._lock:
+            if self.waiting >= self.max_queue:
+                self.rejected += 1
+                return False
+            return True
+
+    @contextmanager
+    def slot(self, timeout: float):
+        with self._lock:
+            if self.waiting >= self.max_queue:
+                self.rejected += 1
+                raise UpstreamOverloaded(f"Too many queued upstream calls in the {self.name} lane")
+            self.waiting += 1
+        started = time.monotonic()
+        acquired = self._slots.acquire(timeout=max(timeout, 0))
+        waited = time.monotonic() - started
+        with self._lock:
+            self.waiting -= 1
+            if not acquired:
+                self.rejected += 1
+            else:
+                self.in_flight += 1
+                self.admitted += 1
+                self.total_wait += waited
+                self.max_wait = max(self.max_wait, waited)
+        if not acquired:
+            raise UpstreamOverloaded(f"Waited {waited:.1f}s for an upstream slot in the {self.name} lane")
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+            self._slots.release()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "limit": self.limit,
+                "max_queue": self.max_queue,
+                "in_flight": self.in_flight,
+                "waiting": self.waiting,
+                "admitted": self.admitted,
+                "rejected": self.rejected,
+                "avg_wait_ms": self.total_wait / self.admitted * 1000 if self.admitted else 0.0,
+                "max_wait_ms": self.max_wait * 1000,
+            }
+
+class RequestAdmission:
+    """Which lane a request's upstream calls use, and whether any of them was shed."""
+
+    def __init__(self, lane: str = INTERACTIVE):
+        self.lane = lane
+        self.shed = False
+
+current_admission: contextvars.ContextVar[Optional[RequestAdmission]] = contextvars.ContextVar("request_admission", default=None)
+
+lanes = {
+    INTERACTIVE: Lane(INTERACTIVE, settings.UPSTREAM_INTERACTIVE_CONCURRENCY, settings.UPSTREAM_INTERACTIVE_MAX_QUEUE),
+    BULK: Lane(BULK, settings.UPSTREAM_BULK_CONCURRENCY, settings.UPSTREAM_BULK_MAX_QUEUE),
+}
+
+@contextmanager
+def upstream_slot(timeout: float):
+    """
+    Hold a slot in the current request's lane for one upstream call. Work outside a request
+    (background refreshes) uses the bulk lane. Raises UpstreamOverloaded when shed.
+    """
+    admission = current_admission.get()
+    lane = lanes[admission.lane if admission is not None else BULK]
+    try:
+        with lane.slot(min(timeout, settings.UPSTREAM_QUEUE_TIMEOUT)):
+            yield
+    except UpstreamOverloaded:
+        if admission is not None:
+            admission.shed = True
+        raise
+
+def retry_after_header() -> dict:
+    return {"Retry-After": str(settings.BULKHEAD_RETRY_AFTER)}
+
+def enter_bulk_lane():
+    """Route the current request's upstream calls through the bulk lane, rejecting it up front with 503 when that lane is backed up."""
+    if not lanes[BULK].admit():
+        raise HTTPException(status_code=503, detail="Bulk upstream capacity is exhausted; retry later.", headers=retry_after_header())
+    admission = current_admission.get()
+    if admission is not None:
+        admission.lane = BULK
+
+_bulk_limiter = None
+
+async def run_in_bulk_threadpool(func, *args):
+    """Like run_in_threadpool, but on a separate, smaller set of worker tokens so bulk work cannot exhaust the shared pool."""
+    global _bulk_limiter
+    if _bulk_limiter is None:
+        # Created lazily: anyio needs a running event loop to build the limiter
+        _bulk_limiter = anyio.CapacityLimiter(settings.BULK_THREADPOOL_SIZE)
+    return await anyio.to_thread.run_sync(func, *args, limiter=_bulk_limiter)
+
+def bulkhead_stats() -> dict:
+    stats = {name: lane.stats() for name, lane in lanes.items()}
+    if _bulk_limiter is not None:
+        stats["bulk_threadpool"] = {
+            "size": _bulk_limiter.total_tokens,
+            "busy": _bulk_limiter.borrowed_tokens,
+            "waiting": _bulk_limiter.statistics().tasks_waiting,
+        }
+    return stats
+
+register_metrics("bulkhead", bulkhead_stats)
@@ -1,18 +1,118 @@
 # app/database.py
-from sqlalchemy import create_engine
+import logging
+import os
+import threading
+import time
+from alembic import command as alembic_command
+from alembic.config import Config as AlembicConfig
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.exc import IntegrityError, OperationalError, ProgrammingError, SQLAlchemyError, TimeoutError as PoolTimeoutError
 from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.pool import QueuePool
 from app.models import User, Settings, TemporaryAsset  # Import models directly
 from app.models.base import Base  # Import Base from models/base.py
 from app.config import settings  # Import the settings from config.py
+from app.metrics import register_metrics
 
 # Set up the engine and session using settings from config.py
-DATABASE_URL = (
+DATABASE_URL = settings.DATABASE_URL or (
     f"mysql+pymysql://{settings.DATABASE_USER}:{settings.DATABASE_PASSWORD}@"
     f"{settings.DATABASE_HOST}:{settings.DATABASE_PORT}/{settings.DATABASE_NAME}"
 )
-engine = create_engine(DATABASE_URL)
+
+logger = logging.getLogger(__name__)
+
+class PoolMetrics:
+    """Checkout wait statistics for one connection pool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record(self, wait: float, timed_out: bool = False):
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+            if timed_out:
+                self.timeouts += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": self.total_wait / self.checkouts * 1000 if self.checkouts else 0.0,
+                "max_wait_ms": self.max_wait * 1000,
+            }
+
+# Keyed by pool logging name, which survives the pool being recreated on dispose()
+pool_metrics = {}
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a free connection."""
+
+    def _do_get(self):
+        metrics = pool_metrics.setdefault(self.logging_name, PoolMetrics())
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            metrics.record(time.perf_counter() - started, timed_out=True)
+            raise
+        metrics.record(time.perf_counter() - started)
+        return connection
+
+def build_engine(url: str, name: str):
+    """Create an engine with the configured, instrumented connection pool."""
+    # SQLite connections are handed between the threadpool's threads
+    connect_args = {"check_same_thread": False} if url.startswith("sqlite") else {}
+    return create_engine(
+        url,
+        connect_args=connect_args,
+        poolclass=InstrumentedQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        pool_logging_name=name,
+    )
+
+def pool_stats(engine) -> dict:
+    """Current pool usage plus checkout wait statistics, for the metrics endpoint."""
+    pool = engine.pool
+    capacity = pool.size() + settings.DB_MAX_OVERFLOW
+    checked_out = pool.checkedout()
+    stats = {
+        "size": pool.size(),
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "checked_out": checked_out,
+        "idle": pool.checkedin(),
+        "saturation": checked_out / capacity if capacity else 0.0,
+    }
+    stats.update(pool_metrics.get(pool.logging_name, PoolMetrics()).snapshot())
+    return stats
+
+engine = build_engine(DATABASE_URL, "primary")
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Read-only sessions go to the replica when one is configured, otherwise to the primary
+read_engine = build_engine(settings.DATABASE_READ_URL, "replica") if settings.DATABASE_READ_URL else engine
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+
+register_metrics("db_pool", lambda: {
+    "primary": pool_stats(engine),
+    **({"replica": pool_stats(read_engine)} if read_engine is not engine else {}),
+})
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
 def get_db():
     """Provide a session for each request."""
     db = SessionLocal()
@@ -21,6 +121,14 @@ def get_db():
     finally:
         db.close()
 
+def get_read_db():
+    """Provide a read-only session, served by the read replica when configured."""
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
 def create_default_user(db: Session):
     """Create a default user if it doesn't exist."""
     default_user = db.query(User).filter(User.username == 'admin').first()
@@ -50,3 +158,97 @@ def create_default_settings(db: Session):
 # Create tables if they do not exist
 def init_db():
     Base.metadata.create_all(bind=engine)
+
+def get_alembic_config() -> AlembicConfig:
+    config = AlembicConfig(os.path.join(PROJECT_ROOT, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(PROJECT_ROOT, "migrations"))
+    # migrations/env.py must not replace the application's logging configuration
+    config.attributes["configure_logger"] = False
+    return config
+
+def get_alembic_script() -> ScriptDirectory:
+    """Load the Alembic migration scripts shipped in migrations/."""
+    return ScriptDirectory.from_config(get_alembic_config())
+
+def verify_schema_revision():
+    """Raise if the database is not stamped with the Alembic head revision."""
+    expected = set(get_alembic_script().get_heads())
+    with engine.connect() as connection:
+        current = set(MigrationContext.configure(connection).get_current_heads())
+    if current != expected:
+        raise RuntimeError(
+            f"Database schema revision {sorted(current) or 'none'} does not match the migrations head "
+            f"{sorted(expected)}. Run 'alembic upgrade head' before starting the application."
+        )
+    logger.info(f"Database schema is at revision {sorted(current)}.")
+
+# Attempts and pause used by "create" when workers starting together race on the first migration
+SCHEMA_CREATE_ATTEMPTS = 10
+SCHEMA_CREATE_RETRY_SECONDS = 1.0
+
+def current_schema_revisions() -> set:
+    with engine.connect() as connection:
+        return set(MigrationContext.configure(connection).get_current_heads())
+
+def migrate_schema():
+    """
+    Bring the database to the Alembic head without dropping anything: an empty database gets
+    every table and is stamped at head, a database from before migrations existed (tables but
+    no revision) is stamped at the 0001 baseline, and the pending migrations are then applied.
+    """
+    expected = set(get_alembic_script().get_heads())
+    current = current_schema_revisions()
+    if current == expected:
+        logger.info(f"Database schema is at revision {sorted(current)}; no DDL needed.")
+        return
+    config = get_alembic_config()
+    if not current:
+        if not inspect(engine).get_table_names():
+            logger.info("Empty database; creating every table at the migrations head.")
+            Base.metadata.create_all(bind=engine)
+            alembic_command.stamp(config, "head")
+            return
+        logger.info("Existing tables without a schema revision; stamping the 0001 baseline.")
+        alembic_command.stamp(config, "0001")
+    logger.info(f"Upgrading database schema from {sorted(current) or ['0001']} to {sorted(expected)}.")
+    alembic_command.upgrade(config, "head")
+
+def _is_concurrent_migration_error(error: SQLAlchemyError) -> bool:
+    """Whether a failed migration looks like another worker running the same DDL at the same time."""
+    if isinstance(error, OperationalError):
+        # Lock waits, deadlocks, "database is locked", SQLite's "table ... already exists"
+        return True
+    if isinstance(error, (ProgrammingError, IntegrityError)):
+        # MySQL and PostgreSQL report an existing table, or a second alembic_version row, this way
+        message = str(error.orig).lower()
+        return "already exists" in message or "duplicate" in message
+    return False
+
+def prepare_schema(mode: str):
+    """Apply the configured schema management mode (see Settings.SCHEMA_MODE)."""
+    if mode == "verify":
+        verify_schema_revision()
+        return
+    if mode == "create":
+        for attempt in range(1, SCHEMA_CREATE_ATTEMPTS + 1):
+            try:
+                migrate_schema()
+                return
+            except SQLAlchemyError as e:
+                # Only a race with another worker's DDL is worth waiting for; anything else is a real error
+                if attempt == SCHEMA_CREATE_ATTEMPTS or not _is_concurrent_migration_error(e):
+                    raise
+                logger.warning(f"Schema migration attempt {attempt} failed ({e.__class__.__name__}); retrying.")
+                time.sleep(SCHEMA_CREATE_RETRY_SECONDS)
+    if mode != "reset":
+        raise ValueError(f"Unknown SCHEMA_MODE '{mode}'; expected 'reset', 'create' or 'verify'.")
+
+    # Development only: wipes every table on each start
+    logger.warning("SCHEMA_MODE=reset: dropping all existing tables.")
+    Base.metadata.drop_all(bind=engine)
+    logger.info("Creating database tables.")
+    Base.metadata.create_all(bind=engine)
+
+    # The tables now match the models, so mark the database as migrated to head
+    with engine.begin() as connection:
+        MigrationContext.configure(connection).stamp(get_alembic_script(), "head")
@@ -0,0 +1,58 @@
+# app/deadline.py
+import contextvars
+import time
+from typing import Optional
+import requests
+
+class DeadlineExceeded(requests.Timeout):
+    """The request's time budget ran out before (or while) calling OpenMetadata."""
+
+class Deadline:
+    """
+    Time budget of one request, shared by every upstream call made on its behalf.
+    The object is shared across threads and copied contexts, so `exceeded` set by a
+    worker is visible to the middleware that created it.
+    """
+
+    def __init__(self, budget: float, from_client: bool = False):
+        self.started = time.monotonic()
+        self.expires_at = self.started + budget
+        self.from_client = from_client
+        self.exceeded = False
+
+    def remaining(self) -> float:
+        return self.expires_at - time.monotonic()
+
+    def extend_default(self, budget: float):
+        """Give a bulk route a longer budget, unless the client asked for a specific one."""
+        if not self.from_client:
+            self.expires_at = max(self.expires_at, self.started + budget)
+
+current_deadline: contextvars.ContextVar[Optional[Deadline]] = contextvars.ContextVar("request_deadline", default=None)
+
+def upstream_timeout(timeout: float) -> float:
+    """
+    Clamp a per-call timeout to what is left of the current request's budget.
+    Raises DeadlineExceeded, without making the call, once the budget is spent.
+    """
+    deadline = current_deadline.get()
+    if deadline is None:
+        return timeout
+    remaining = deadline.remaining()
+    if remaining <= 0:
+        deadline.exceeded = True
+        raise DeadlineExceeded(f"Request deadline exceeded {-remaining:.2f}s ago; not calling OpenMetadata.")
+    return min(timeout, remaining)
+
+def deadline_expired() -> bool:
+    """True when the current request has a budget and it is spent (marking it as exceeded)."""
+    deadline = current_deadline.get()
+    if deadline is None or deadline.remaining() > 0:
+        return False
+    deadline.exceeded = True
+    return True
+
+def extend_default_deadline(budget: float):
+    deadline = current_deadline.get()
+    if deadline is not None:
+        deadline.extend_default(budget)
@@ -0,0 +1,114 @@
+# app/entity_cache.py
+import logging
+import threading
+import time
+from typing import Optional
+from app.cache import TTLCache, SingleFlight
+from app.config import settings
+from app.metrics import register_metrics
+from app.openmetadata_client import openmetadata_client
+
+logger = logging.getLogger(__name__)
+
+class CachedEntity:
+    """An entity body together with the validators needed to revalidate it."""
+
+    def __init__(self, body: dict, etag: Optional[str]):
+        self.body = body
+        self.etag = etag
+        self.version = body.get("version")
+        self.validated_at = time.monotonic()
+
+class EntityCache:
+    """
+    Read-through cache of OpenMetadata entities keyed by type, id and query params.
+    Entries younger than `fresh_for` seconds are served as is. Older ones are revalidated
+    with If-None-Match when OpenMetadata sent an ETag, so unchanged entities cost a 304
+    instead of the full payload; without an ETag the entity is refetched and its `version`
+    tells whether it changed. Idle entries expire after `ttl`, and at most `maxsize` are kept.
+    Every call uses the shared service token, so entries are not partitioned per caller.
+    """
+
+    def __init__(self, client, ttl: float, maxsize: int, fresh_for: float):
+        self.client = client
+        self.fresh_for = fresh_for
+        self._entries = TTLCache(ttl=ttl, maxsize=maxsize)
+        self._flight = SingleFlight()
+        self._lock = threading.Lock()
+        self._counters = {"fresh": 0, "not_modified": 0, "unchanged": 0, "changed": 0, "loaded": 0}
+
+    @staticmethod
+    def _key(entity_type: str, entity_id: str, params: Optional[dict]) -> tuple:
+        return entity_type, entity_id, tuple(sorted((params or {}).items()))
+
+    def _count(self, outcome: str):
+        with self._lock:
+            self._counters[outcome] += 1
+
+    def get(self, entity_type: str, entity_id: str, headers: dict, params: dict = None, revalidate: bool = False) -> dict:
+        """
+        Return the entity body, which callers must not modify.
+        revalidate=True always checks with OpenMetadata first, for callers about to act on the version.
+        Raises requests.HTTPError for error responses, like response.raise_for_status().
+        """
+        key = self._key(entity_type, entity_id, params)
+        entry = self._entries.get(key)
+        if entry is not None and not revalidate and time.monotonic() - entry.validated_at < self.fresh_for:
+            self._count("fresh")
+            return entry.body
+        return self._flight.do(key, self._fetch, key, entry, headers, params)
+
+    def _fetch(self, key: tuple, entry: Optional[CachedEntity], headers: dict, params: Optional[dict]) -> dict:
+        entity_type, entity_id, _ = key
+        request_headers = headers
+        if entry is not None and entry.etag:
+            request_headers = {**headers, "If-None-Match": entry.etag}
+
+        response = self.client.get(f"/{entity_type}/{entity_id}", headers=request_headers, params=params)
+        if response.status_code == 304 and entry is not None:
+            self._count("not_modified")
+            entry.validated_at = time.monotonic()
+            self._entries.set(key, entry)
+            return entry.body
+        if response.status_code == 404:
+            self._entries.invalidate(key)
+        response.raise_for_status()
+
+        fetched = CachedEntity(response.json(), response.headers.get("ETag"))
+        if entry is None:
+            self._count("loaded")
+        elif fetched.version is not None and fetched.version == entry.version:
+            # Same version: keep the existing body so callers holding it see one object
+            self._count("unchanged")
+            entry.etag = fetched.etag or entry.etag
+            entry.validated_at = fetched.validated_at
+            fetched = entry
+        else:
+            self._count("changed")
+            logger.debug(f"{entity_type} {entity_id} changed from version {entry.version} to {fetched.version}.")
+        self._entries.set(key, fetched)
+        return fetched.body
+
+    def invalidate(self, entity_type: str, entity_id: str):
+        """Drop every cached variant of an entity, e.g. after writing to it."""
+        self._entries.invalidate_matching(lambda key, _: key[0] == entity_type and key[1] == entity_id)
+
+    def stats(self) -> dict:
+        with self._lock:
+            counters = dict(self._counters)
+        stats = self._entries.stats()
+        lookups = sum(counters.values())
+        served_without_payload = counters["fresh"] + counters["not_modified"]
+        return {
+            **stats,
+            **counters,
+            "payload_free_rate": served_without_payload / lookups if lookups else 0.0,
+        }
+
+entity_cache = EntityCache(
+    openmetadata_client,
+    ttl=settings.ENTITY_CACHE_TTL,
+    maxsize=settings.ENTITY_CACHE_MAXSIZE,
+    fresh_for=settings.ENTITY_CACHE_FRESH_SECONDS,
+)
+register_metrics("entity_cache", entity_cache.stats)
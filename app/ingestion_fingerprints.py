@@ -0,0 +1,83 @@
+# app/ingestion_fingerprints.py
+import hashlib
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.models import IngestedTableFingerprint
+
+logger = logging.getLogger(__name__)
+
+# Table payload fields whose content decides whether an upload must be written to OpenMetadata
+FINGERPRINT_FIELDS = ("name", "displayName", "description", "columns", "owners", "databaseSchema")
+
+# Rows per IN (...) query
+QUERY_CHUNK_SIZE = 500
+
+def table_fingerprint(table_payload: dict) -> str:
+    """sha256 of the payload fields in FINGERPRINT_FIELDS, independent of key order."""
+    content = {field: table_payload.get(field) for field in FINGERPRINT_FIELDS}
+    encoded = json.dumps(content, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+def _chunks(values: list):
+    for start in range(0, len(values), QUERY_CHUNK_SIZE):
+        yield values[start:start + QUERY_CHUNK_SIZE]
+
+def load_fingerprints(db: Session, fqns: Iterable[str]) -> Dict[str, str]:
+    """
+    Fingerprints of the given tables, by fully qualified name. Entries older than
+    INGESTION_FINGERPRINT_MAX_AGE are left out, so every table is rewritten now and then
+    even if it was changed in OpenMetadata behind our back.
+    """
+    fqns = list(dict.fromkeys(fqns))
+    if not fqns:
+        return {}
+    query = db.query(IngestedTableFingerprint.fully_qualified_name, IngestedTableFingerprint.fingerprint)
+    if settings.INGESTION_FINGERPRINT_MAX_AGE > 0:
+        oldest = datetime.utcnow() - timedelta(seconds=settings.INGESTION_FINGERPRINT_MAX_AGE)
+        query = query.filter(IngestedTableFingerprint.ingested_at >= oldest)
+    fingerprints = {}
+    for chunk in _chunks(fqns):
+        fingerprints.update(query.filter(IngestedTableFingerprint.fully_qualified_name.in_(chunk)).all())
+    return fingerprints
+
+def save_fingerprints(db: Session, entries: List[dict], retry: bool = True):
+    """Upsert {"fqn", "fingerprint", "table_id"} entries in one transaction."""
+    latest = {entry["fqn"]: entry for entry in entries}  # The last write of a table wins
+    if not latest:
+        return
+    now = datetime.utcnow()
+    existing = {}
+    for chunk in _chunks(list(latest)):
+        rows = db.query(IngestedTableFingerprint).filter(IngestedTableFingerprint.fully_qualified_name.in_(chunk)).all()
+        existing.update((row.fully_qualified_name, row) for row in rows)
+    for fqn, entry in latest.items():
+        row = existing.get(fqn)
+        if row is None:
+            row = IngestedTableFingerprint(fully_qualified_name=fqn)
+            db.add(row)
+        row.fingerprint = entry["fingerprint"]
+        row.table_id = entry.get("table_id")
+        row.ingested_at = now
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        if not retry:
+            raise
+        # A concurrent upload inserted some of these tables first; update its rows instead
+        logger.info("Concurrent insert while saving table fingerprints; retrying.")
+        save_fingerprints(db, entries, retry=False)
+
+def forget_fingerprints(db: Session, table_ids: Iterable[str]):
+    """Drop the fingerprints of tables changed or deleted outside uploads, so the next upload rewrites them."""
+    table_ids = [table_id for table_id in dict.fromkeys(table_ids) if table_id]
+    if not table_ids:
+        return
+    for chunk in _chunks(table_ids):
+        db.query(IngestedTableFingerprint).filter(IngestedTableFingerprint.table_id.in_(chunk)).delete(synchronize_session=False)
+    db.commit()
@@ -1,13 +1,24 @@
 # app/main.py
+import time
+_import_started = time.perf_counter()
+
 import sys
 import os
 import logging
-from fastapi import FastAPI
+import importlib
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
-from app.database import engine, SessionLocal, create_default_user, create_default_settings
-from app import models
+from app.database import SessionLocal, create_default_user, create_default_settings, prepare_schema
 from app.config import settings
+from app.bulkhead import RequestAdmission, UpstreamOverloaded, current_admission, retry_after_header
+from app.deadline import Deadline, current_deadline
+from app.metrics import register_metrics
+from app.openmetadata_client import openmetadata_client
+from app.regeneration import regeneration_jobs
+from app.unowned_catalog import unowned_index_refresher
+from app.upstream_trace import RequestTrace, current_trace
 
 # Configure logging for the entire application
 logging.basicConfig(
@@ -28,13 +39,9 @@ project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
-# Drop all existing tables (use caution in production)
-logger.warning("Dropping all existing tables - use caution in production.")
-models.Base.metadata.drop_all(bind=engine)
-
-# Create tables in the database
-logger.info("Creating database tables.")
-models.Base.metadata.create_all(bind=engine)
+# Startup-time breakdown in milliseconds, logged once startup completes and exposed under /metrics
+startup_timings = {"imports": (time.perf_counter() - _import_started) * 1000}
+register_metrics("startup", lambda: startup_timings)
 
 # Initialize FastAPI app with debug setting from config
 app = FastAPI(debug=settings.DEBUG)
@@ -49,25 +56,122 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Index-Refreshed-At", "ETag", "Server-Timing", "X-Partial-Result", "Retry-After"],
 )
 
-# Import and include routers with a versioned prefix
-# Import and include routers with a versioned prefix
-from app.routers import team_assets, users, assets, metadata, unowned_assets, temporary_assets
-from app.routers.metadata_routes import router as metadata_router  # Corrected import path
+@app.middleware("http")
+async def admission_control(request: Request, call_next):
+    """
+    Route each request's OpenMetadata calls through the interactive bulkhead lane (bulk routes
+    switch to the bulk lane). When a call was shed, server errors become 503 with Retry-After
+    and other responses are flagged with X-Partial-Result.
+    """
+    admission = RequestAdmission()
+    token = current_admission.set(admission)
+    try:
+        response = await call_next(request)
+    except UpstreamOverloaded as e:
+        logger.warning(f"{request.method} {request.url.path} shed: {e}")
+        return JSONResponse(status_code=503, content={"detail": str(e)}, headers=retry_after_header())
+    finally:
+        current_admission.reset(token)
+    if not admission.shed:
+        return response
+    logger.warning(f"{request.method} {request.url.path} had upstream calls shed in the {admission.lane} lane.")
+    if response.status_code >= 500:
+        return JSONResponse(
+            status_code=503,
+            content={"detail": "OpenMetadata capacity is exhausted; retry later."},
+            headers=retry_after_header(),
+        )
+    response.headers["X-Partial-Result"] = "upstream-overloaded"
+    return response
 
-app.include_router(users.router, prefix="/api/v1")
-app.include_router(assets.router, prefix="/api/v1")
-app.include_router(metadata.router, prefix="/api/v1")
-app.include_router(team_assets.router, prefix="/api/v1")
-app.include_router(unowned_assets.router, prefix="/api/v1")
-app.include_router(temporary_assets.router, prefix="/api/v1")
-app.include_router(metadata_router, prefix="/api/v1")  # Add the new metadata router
+@app.middleware("http")
+async def apply_request_deadline(request: Request, call_next):
+    """
+    Give each request a time budget for its OpenMetadata calls: X-Request-Timeout (seconds,
+    capped) or REQUEST_DEADLINE_SECONDS. When the budget ran out, server errors become 504
+    and other responses are flagged with X-Partial-Result.
+    """
+    budget, from_client = settings.REQUEST_DEADLINE_SECONDS, False
+    requested = request.headers.get("x-request-timeout")
+    if requested:
+        try:
+            budget, from_client = min(float(requested), settings.REQUEST_DEADLINE_MAX_SECONDS), True
+        except ValueError:
+            logger.warning(f"Ignoring invalid X-Request-Timeout header: {requested!r}")
+    if budget <= 0:
+        return await call_next(request)
+
+    deadline = Deadline(budget, from_client=from_client)
+    token = current_deadline.set(deadline)
+    try:
+        response = await call_next(request)
+    finally:
+        current_deadline.reset(token)
+    if not deadline.exceeded:
+        return response
+    logger.warning(f"{request.method} {request.url.path} exceeded its {budget:g}s deadline.")
+    if response.status_code >= 500:
+        return JSONResponse(status_code=504, content={"detail": f"Request deadline of {budget:g}s exceeded"})
+    response.headers["X-Partial-Result"] = "deadline-exceeded"
+    return response
+
+@app.middleware("http")
+async def trace_upstream_calls(request: Request, call_next):
+    """Collect the OpenMetadata calls made for each request and report them in a Server-Timing header."""
+    trace = RequestTrace()
+    token = current_trace.set(trace)
+    started = time.perf_counter()
+    try:
+        response = await call_next(request)
+    finally:
+        current_trace.reset(token)
+    calls, upstream_ms = trace.totals()
+    total_ms = (time.perf_counter() - started) * 1000
+    # Streaming responses report the calls made before their headers were sent
+    response.headers["Server-Timing"] = (
+        f'upstream;dur={upstream_ms:.1f};desc="{calls} OpenMetadata calls", total;dur={total_ms:.1f}'
+    )
+    if calls:
+        logger.debug(f"{request.method} {request.url.path}: {calls} upstream calls, {upstream_ms:.1f} ms upstream, {total_ms:.1f} ms total")
+    return response
+
+# Router modules, imported on demand by include_routers() so their import cost shows up per router
+ROUTER_MODULES = [
+    "app.routers.users",
+    "app.routers.assets",
+    "app.routers.metadata",
+    "app.routers.team_assets",
+    "app.routers.unowned_assets",
+    "app.routers.temporary_assets",
+    "app.routers.metadata_routes",
+    "app.routers.metrics",
+]
+
+def include_routers(app: FastAPI):
+    """Import each router module and include it with a versioned prefix, timing each one."""
+    for module_name in ROUTER_MODULES:
+        started = time.perf_counter()
+        module = importlib.import_module(module_name)
+        app.include_router(module.router, prefix="/api/v1")
+        startup_timings[f"router:{module_name.rsplit('.', 1)[-1]}"] = (time.perf_counter() - started) * 1000
+
+# At import, so the routes exist however the app is served, with or without its lifespan
+include_routers(app)
 
 # Define a lifespan event handler to manage app startup and shutdown
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    logger.info("Application startup - initializing default user and settings.")
+    started = time.perf_counter()
+    logger.info(f"Application startup - preparing database schema (SCHEMA_MODE={settings.SCHEMA_MODE}).")
+    # Schema problems must stop the worker instead of serving against the wrong schema
+    prepare_schema(settings.SCHEMA_MODE)
+    startup_timings["schema"] = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    logger.info("Initializing default user and settings.")
     db = SessionLocal()
     try:
         create_default_user(db)
@@ -79,10 +183,21 @@ async def lifespan(app: FastAPI):
         logger.error(f"Error during startup: {e}")
     finally:
         db.close()
+    startup_timings["defaults"] = (time.perf_counter() - started) * 1000
+
+    if settings.UNOWNED_ASSETS_INDEX_ENABLED:
+        unowned_index_refresher.start()
+
+    startup_timings["total"] = sum(value for key, value in startup_timings.items() if key != "total")
+    breakdown = ", ".join(f"{key}={value:.1f}ms" for key, value in startup_timings.items() if key != "total")
+    logger.info(f"Startup completed in {startup_timings['total']:.1f} ms ({breakdown})")
 
     yield  # Pass control to the app lifecycle here
 
     # Code to run at shutdown
+    unowned_index_refresher.stop()
+    regeneration_jobs.shutdown()
+    openmetadata_client.close()
     logger.info("Application shutdown.")
 
 # Set lifespan context for the application
@@ -0,0 +1,25 @@
+# app/metrics.py
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+_collectors = {}
+_lock = threading.Lock()
+
+def register_metrics(name: str, collector):
+    """Register a callable returning a JSON-serializable dict, exposed under `name` by GET /metrics."""
+    with _lock:
+        _collectors[name] = collector
+
+def collect_metrics() -> dict:
+    with _lock:
+        collectors = dict(_collectors)
+    metrics = {}
+    for name, collector in collectors.items():
+        try:
+            metrics[name] = collector()
+        except Exception as e:
+            logger.error(f"Failed to collect metrics for '{name}': {str(e)}")
+            metrics[name] = {"error": str(e)}
+    return metrics
@@ -5,10 +5,11 @@ from app.models.base import Base
 
 # Import each model
 from app.models.user import User
-from app.models.asset import Asset
+from app.models.asset import Asset, UnownedAsset, UnownedAssetSync, IngestedTableFingerprint
 from app.models.metadata_history import MetadataHistory
 from app.models.settings import Settings  # Ensure Settings is imported
+from app.models.regeneration_job import RegenerationJobRecord
 from .temporary_asset import TemporaryAsset
 
 # Specify all models in __all__ for easier imports elsewhere
-__all__ = ["Base", "User", "Asset", "MetadataHistory", "Settings", "TemporaryAsset"]
+__all__ = ["Base", "User", "Asset", "UnownedAsset", "UnownedAssetSync", "IngestedTableFingerprint", "MetadataHistory", "Settings", "TemporaryAsset", "RegenerationJobRecord"]
@@ -1,5 +1,5 @@
 # app/models/asset.py
-from sqlalchemy import Column, String, DateTime, Text, ForeignKey, Integer
+from sqlalchemy import Column, String, DateTime, Text, ForeignKey, Integer, BigInteger, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.models.base import Base
@@ -29,3 +29,45 @@ class Asset(Base):
             "owner_team": self.owner_team,
             "owner_id": self.owner_id,
         }
+
+class UnownedAsset(Base):
+    """Locally materialized copy of the OpenMetadata assets that have no owner."""
+    __tablename__ = "unowned_assets"
+    __table_args__ = (Index("ix_unowned_assets_data_type_id", "data_type", "id"),)
+
+    id = Column(String(255), primary_key=True)
+    data_type = Column(String(50), nullable=False)
+    display_name = Column(String(255))
+    fully_qualified_name = Column(String(1024))
+    updated_at = Column(BigInteger)  # OpenMetadata updatedAt (epoch millis)
+    synced_at = Column(DateTime, default=datetime.utcnow)  # Last refresh that wrote this row
+
+    def to_dict(self):
+        # Same shape as the live /unowned-assets response
+        return {
+            "id": self.id,
+            "displayName": self.display_name,
+            "updatedAt": self.updated_at,
+            "dataType": self.data_type,
+            "fullyQualifiedName": self.fully_qualified_name,
+        }
+
+class UnownedAssetSync(Base):
+    """Refresh state of the unowned-asset index, one row per asset type."""
+    __tablename__ = "unowned_asset_sync"
+
+    data_type = Column(String(50), primary_key=True)
+    watermark = Column(BigInteger, default=0)  # Changes with updatedAt above this are applied on the next refresh
+    refreshed_at = Column(DateTime)
+    full_synced_at = Column(DateTime)
+    lease_owner = Column(String(255))  # Worker refreshing this type, so only one worker does it at a time
+    lease_expires_at = Column(DateTime)  # After this the lease may be taken over, e.g. when its worker died
+
+class IngestedTableFingerprint(Base):
+    """Content hash of the last table payload successfully written to OpenMetadata by an upload."""
+    __tablename__ = "ingested_table_fingerprints"
+
+    fully_qualified_name = Column(String(512), primary_key=True)
+    fingerprint = Column(String(64), nullable=False)  # sha256 of the fields compared by app.ingestion_fingerprints
+    table_id = Column(String(255), index=True)  # OpenMetadata id, so edits and deletes can drop the entry
+    ingested_at = Column(DateTime, default=datetime.utcnow)
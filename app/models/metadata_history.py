@@ -1,11 +1,13 @@
 # app/models/metadata_history.py
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.models.base import Base
 
 class MetadataHistory(Base):
     __tablename__ = "metadata_histories"
+    # Serves the per-asset history listing, ordered by (created_at, id)
+    __table_args__ = (Index("ix_metadata_histories_asset_id_created_at", "asset_id", "created_at", "id"),)
 
     id = Column(Integer, primary_key=True, index=True)
     asset_id = Column(String(255), ForeignKey("assets.id"), nullable=False)  # Reference to Asset
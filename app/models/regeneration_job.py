@@ -0,0 +1,17 @@
+# app/models/regeneration_job.py
+from sqlalchemy import Column, String, DateTime, Text, Index
+from app.models.base import Base
+
+class RegenerationJobRecord(Base):
+    """Status and results of a regeneration job, shared by every worker process."""
+    __tablename__ = "regeneration_jobs"
+    __table_args__ = (Index("ix_regeneration_jobs_finished_at", "finished_at"),)
+
+    id = Column(String(32), primary_key=True)
+    status = Column(String(20), nullable=False)  # queued, running, completed, partial, failed
+    item_counts = Column(Text)  # JSON object: item status -> count
+    results = Column(Text(4294967295))  # JSON list of per-asset results once finished (LONGTEXT on MySQL)
+    owner = Column(String(255))  # host:pid of the worker process running the job
+    created_at = Column(DateTime, nullable=False)
+    updated_at = Column(DateTime)
+    finished_at = Column(DateTime)  # Records are kept for REGENERATION_JOB_TTL seconds after this
@@ -0,0 +1,122 @@
+# app/openmetadata_client.py
+import logging
+import time
+from urllib.parse import urlparse
+import requests
+from requests.adapters import HTTPAdapter
+from app.bulkhead import UpstreamOverloaded, upstream_slot
+from app.cache import SingleFlight
+from app.config import settings
+from app.deadline import DeadlineExceeded, current_deadline, upstream_timeout
+from app.metrics import register_metrics
+from app.upstream_trace import record_upstream_call
+
+logger = logging.getLogger(__name__)
+
+def build_headers(token: str, content_type: str = "application/json") -> dict:
+    """Build the authorization headers for OpenMetadata API requests."""
+    return {
+        "Authorization": f"Bearer {token}",
+        "Content-Type": content_type
+    }
+
+class OpenMetadataClient:
+    """
+    Thin wrapper around a pooled requests.Session for the OpenMetadata API.
+    Connections are kept alive and reused across calls instead of opening a new
+    TCP/TLS connection per request.
+    """
+
+    def __init__(self, base_url: str, pool_size: int = 20, timeout: float = 10.0, coalesce_gets: bool = True):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.coalesce_gets = coalesce_gets
+        self._reads = SingleFlight()
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def url(self, path: str) -> str:
+        """Resolve a path relative to the OpenMetadata API URL."""
+        if path.startswith(("http://", "https://")):
+            return path
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    def request(self, method: str, path: str, timeout: float = None, **kwargs) -> requests.Response:
+        """
+        Send a request through the shared session and record it in the upstream trace.
+        The call first takes a slot in the request's bulkhead lane (UpstreamOverloaded when shed).
+        The timeout is the default (or given) one, clamped to the remaining request deadline;
+        DeadlineExceeded (a requests.Timeout) is raised once that deadline is spent.
+        """
+        with upstream_slot(upstream_timeout(timeout or self.timeout)):
+            # Re-clamp: waiting for the slot used part of the deadline
+            call_timeout = upstream_timeout(timeout or self.timeout)
+            started = time.perf_counter()
+            status = None
+            try:
+                response = self.session.request(method, self.url(path), timeout=call_timeout, **kwargs)
+                status = response.status_code
+                return response
+            except requests.Timeout as e:
+                deadline = current_deadline.get()
+                if deadline is not None and deadline.remaining() <= 0:
+                    deadline.exceeded = True
+                    raise DeadlineExceeded(f"Request deadline exceeded during {method} {path}") from e
+                raise
+            finally:
+                endpoint = urlparse(path).path if path.startswith(("http://", "https://")) else path
+                record_upstream_call(method, endpoint, status, (time.perf_counter() - started) * 1000)
+
+    def get(self, path: str, **kwargs) -> requests.Response:
+        """
+        GET through request(), sharing one upstream call among concurrent identical GETs (same URL,
+        params, Authorization and If-None-Match). The shared Response is fully read and must not be
+        modified by callers. GETs with other options (e.g. stream=True) are never coalesced.
+        """
+        if not self.coalesce_gets or not set(kwargs) <= {"headers", "params", "timeout"}:
+            return self.request("GET", path, **kwargs)
+        headers = kwargs.get("headers") or {}
+        url = requests.Request("GET", self.url(path), params=kwargs.get("params")).prepare().url
+        key = (url, headers.get("Authorization"), headers.get("If-None-Match"))
+        led = []
+
+        def send():
+            led.append(True)
+            return self.request("GET", path, **kwargs)
+
+        try:
+            return self._reads.do(key, send)
+        except (DeadlineExceeded, UpstreamOverloaded):
+            if led:
+                raise
+            # The leader's own deadline or bulkhead lane ran out, which says nothing about this caller's
+            return self.request("GET", path, **kwargs)
+
+    def coalescing_stats(self) -> dict:
+        return self._reads.stats()
+
+    def post(self, path: str, **kwargs) -> requests.Response:
+        return self.request("POST", path, **kwargs)
+
+    def put(self, path: str, **kwargs) -> requests.Response:
+        return self.request("PUT", path, **kwargs)
+
+    def patch(self, path: str, **kwargs) -> requests.Response:
+        return self.request("PATCH", path, **kwargs)
+
+    def delete(self, path: str, **kwargs) -> requests.Response:
+        return self.request("DELETE", path, **kwargs)
+
+    def close(self):
+        self.session.close()
+
+# Shared client used by utils, asset handlers and routers
+openmetadata_client = OpenMetadataClient(
+    settings.OPENMETADATA_API_URL,
+    pool_size=settings.OPENMETADATA_POOL_SIZE,
+    timeout=settings.OPENMETADATA_TIMEOUT,
+    coalesce_gets=settings.OPENMETADATA_COALESCE_GETS,
+)
+register_metrics("upstream_coalescing", openmetadata_client.coalescing_stats)
@@ -0,0 +1,62 @@
+# app/principal_cache.py
+import hashlib
+import time
+from dataclasses import dataclass
+from typing import Optional
+from sqlalchemy import event
+from app.cache import TTLCache
+from app.config import settings
+from app.metrics import register_metrics
+from app.models import User
+
+@dataclass(frozen=True)
+class UserSnapshot:
+    """Detached, read-only view of the authenticated user, safe to share across requests and threads."""
+    id: int
+    username: str
+    role: str
+    team: Optional[str]
+    team_id: Optional[str]
+
+    @classmethod
+    def from_user(cls, user: User) -> "UserSnapshot":
+        return cls(id=user.id, username=user.username, role=user.role, team=user.team, team_id=user.team_id)
+
+class PrincipalCache:
+    """Bounded LRU of verified access tokens mapped to user snapshots."""
+
+    def __init__(self, ttl: float, maxsize: int):
+        self._cache = TTLCache(ttl=ttl, maxsize=maxsize)
+
+    @staticmethod
+    def _key(token: str) -> str:
+        # Keep digests rather than the bearer tokens themselves
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    def get(self, token: str) -> Optional[UserSnapshot]:
+        return self._cache.get(self._key(token))
+
+    def put(self, token: str, snapshot: UserSnapshot, expires_at: Optional[float] = None):
+        """Cache a snapshot, never beyond the token's own `exp` (epoch seconds)."""
+        ttl = self._cache.ttl
+        if expires_at is not None:
+            ttl = min(ttl, expires_at - time.time())
+        if ttl > 0:
+            self._cache.set(self._key(token), snapshot, ttl=ttl)
+
+    def invalidate_user(self, user_id: int):
+        self._cache.invalidate_matching(lambda _, snapshot: snapshot.id == user_id)
+
+    def invalidate(self):
+        self._cache.invalidate()
+
+    def stats(self) -> dict:
+        return self._cache.stats()
+
+principal_cache = PrincipalCache(ttl=settings.PRINCIPAL_CACHE_TTL, maxsize=settings.PRINCIPAL_CACHE_MAXSIZE)
+register_metrics("principal_cache", principal_cache.stats)
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_cached_principal(mapper, connection, target):
+    principal_cache.invalidate_user(target.id)
@@ -0,0 +1,403 @@
+# app/regeneration.py
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+from sqlalchemy.exc import SQLAlchemyError
+from app.cache import TTLCache
+from app.config import settings
+from app.database import SessionLocal
+from app.metrics import register_metrics
+from app.models import RegenerationJobRecord
+
+logger = logging.getLogger(__name__)
+
+# Part of every cache key: bump it whenever generate_metadata starts producing different output
+GENERATOR_VERSION = "mock-1"
+
+def generate_metadata(request: dict) -> dict:
+    """
+    Regenerate metadata suggestions for one asset (simulated with mock data).
+    Runs inside the job pool, possibly in a worker process, so it takes and returns plain dicts.
+    """
+    # Simulate the external script output using mock data
+    # In a real scenario, you would call the external script here
+    return {
+        "displayName": request["displayName"],
+        "description": f"Regenerated description for {request['displayName']}",
+        "attributes": [
+            {"name": attr_name, "description": f"Regenerated description for {attr_name}"}
+            for attr_name in request["attributes"]
+        ],
+        "tag": "RegeneratedTag"
+    }
+
+def _content_key(kind: str, value) -> str:
+    payload = json.dumps([GENERATOR_VERSION, kind, value], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class RegenerationPlan:
+    """
+    What is already known for one regeneration request and what is left for the generator.
+    Built by RegenerationCache.plan() in the server process; only `pending` crosses into the pool.
+    """
+
+    def __init__(self, request: dict, result: Optional[dict], table: Optional[dict], attributes: dict):
+        self.request = request
+        self.display_name = request["displayName"].strip()
+        self.attribute_names = [name.strip() for name in request["attributes"]]
+        self.result = result
+        self.table = table
+        self.attributes = attributes
+        self.missing = [name for name in dict.fromkeys(self.attribute_names) if name not in attributes]
+
+    @property
+    def pending(self) -> Optional[dict]:
+        """The request to send to the generator, or None when everything was cached."""
+        if self.result is not None or (self.table is not None and not self.missing):
+            return None
+        return {"assetId": self.request.get("assetId"), "displayName": self.display_name, "attributes": self.missing}
+
+    def assemble(self, generated: Optional[dict] = None) -> dict:
+        """Merge cached parts with freshly generated ones, keeping the requested attribute order."""
+        if self.result is not None:
+            return self.result
+        table = self.table
+        descriptions = dict(self.attributes)
+        if generated is not None:
+            table = {"displayName": generated["displayName"], "description": generated["description"], "tag": generated["tag"]}
+            descriptions.update((attr["name"], attr["description"]) for attr in generated["attributes"])
+        return {
+            **table,
+            "attributes": [{"name": name, "description": descriptions[name]} for name in self.attribute_names],
+        }
+
+class RegenerationCache:
+    """
+    Content-addressed cache of regeneration output. Whole results are keyed by a hash of the
+    normalized input, and table-level fields and column descriptions are also cached on their
+    own, so a request that shares columns with an earlier one only generates the new columns.
+    """
+
+    def __init__(self, ttl: float, maxsize: int):
+        self._results = TTLCache(ttl=ttl, maxsize=maxsize)
+        self._tables = TTLCache(ttl=ttl, maxsize=maxsize)
+        self._attributes = TTLCache(ttl=ttl, maxsize=maxsize)
+
+    @staticmethod
+    def _result_key(display_name: str, attribute_names: List[str]) -> str:
+        return _content_key("result", {"displayName": display_name, "attributes": attribute_names})
+
+    def plan(self, request: dict, bypass: bool = False) -> RegenerationPlan:
+        if bypass:
+            return RegenerationPlan(request, None, None, {})
+        display_name = request["displayName"].strip()
+        attribute_names = [name.strip() for name in request["attributes"]]
+        result = self._results.get(self._result_key(display_name, attribute_names))
+        table = self._tables.get(_content_key("table", display_name))
+        attributes = {}
+        for name in dict.fromkeys(attribute_names):
+            description = self._attributes.get(_content_key("attribute", name))
+            if description is not None:
+                attributes[name] = description
+        return RegenerationPlan(request, result, table, attributes)
+
+    def store(self, plan: RegenerationPlan, generated: dict):
+        """Record generated output, then the assembled result for the whole request."""
+        self._tables.set(_content_key("table", plan.display_name), {
+            "displayName": generated["displayName"],
+            "description": generated["description"],
+            "tag": generated["tag"],
+        })
+        for attr in generated["attributes"]:
+            self._attributes.set(_content_key("attribute", attr["name"]), attr["description"])
+        self._results.set(self._result_key(plan.display_name, plan.attribute_names), plan.assemble(generated))
+
+    def invalidate(self):
+        self._results.invalidate()
+        self._tables.invalidate()
+        self._attributes.invalidate()
+
+    def stats(self) -> dict:
+        return {"results": self._results.stats(), "tables": self._tables.stats(), "attributes": self._attributes.stats()}
+
+class RegenerationJob:
+    """A batch of regeneration requests whose state is derived from one future per asset."""
+
+    def __init__(self, requests: List[dict]):
+        self.id = uuid.uuid4().hex
+        self.created_at = time.time()
+        self.requests = requests
+        # One (plan, future) per request; future is None when the cache answered the request
+        self.items: List[tuple] = []
+
+    @staticmethod
+    def _item_status(future: Optional[Future]) -> str:
+        if future is None:
+            return "completed"
+        if future.cancelled():
+            return "cancelled"
+        if not future.done():
+            return "running" if future.running() else "queued"
+        return "failed" if future.exception() is not None else "completed"
+
+    @property
+    def status(self) -> str:
+        statuses = {self._item_status(future) for _, future in self.items}
+        if statuses & {"queued", "running"}:
+            return "running" if statuses - {"queued"} else "queued"
+        if statuses == {"completed"}:
+            return "completed"
+        return "partial" if "completed" in statuses else "failed"
+
+    @property
+    def done(self) -> bool:
+        return all(future is None or future.done() for _, future in self.items)
+
+    def summary(self) -> dict:
+        counts = {}
+        for _, future in self.items:
+            status = self._item_status(future)
+            counts[status] = counts.get(status, 0) + 1
+        return {"jobId": self.id, "status": self.status, "createdAt": self.created_at, "items": counts}
+
+    def results(self) -> List[dict]:
+        """Per-asset outcomes in submission order; only meaningful once the job is done."""
+        results = []
+        for plan, future in self.items:
+            item = {"assetId": plan.request["assetId"], "status": self._item_status(future), "cached": future is None}
+            if item["status"] == "completed":
+                item["metadata"] = plan.assemble(future.result() if future is not None else None)
+            elif item["status"] == "failed":
+                item["error"] = str(future.exception())
+            results.append(item)
+        return results
+
+class RegenerationQueueFull(Exception):
+    """This worker already runs `max_jobs` unfinished jobs."""
+
+def _epoch(value: datetime) -> float:
+    return value.replace(tzinfo=timezone.utc).timestamp()
+
+class RegenerationJobManager:
+    """
+    Runs regeneration requests on a bounded thread or process pool. Job records are written to
+    the database as items finish, so any worker can answer status and result polls; finished
+    records are kept for `result_ttl` seconds. Unfinished jobs are never evicted: a worker takes
+    at most `max_jobs` of them and rejects further submissions with RegenerationQueueFull.
+    """
+
+    def __init__(self, cache: RegenerationCache, executor_kind: str, max_workers: int, result_ttl: float, max_jobs: int,
+                 session_factory=SessionLocal):
+        self.cache = cache
+        self.executor_kind = executor_kind
+        self.max_workers = max_workers
+        self.result_ttl = result_ttl
+        self.max_jobs = max_jobs
+        self.session_factory = session_factory
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self._active = {}  # job id -> RegenerationJob, until it finishes
+        self._unstored = TTLCache(ttl=result_ttl, maxsize=max_jobs)  # Finished jobs whose final write failed
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self._store_lock = threading.Lock()  # Keeps record writes in order, so a stale state never overwrites a newer one
+
+    def _get_executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                if self.executor_kind == "process":
+                    # spawn, not fork: the server process already runs background threads
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.max_workers,
+                        mp_context=multiprocessing.get_context("spawn")
+                    )
+                else:
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="regenerate")
+                logger.info(f"Started {self.executor_kind} pool with {self.max_workers} workers for metadata regeneration.")
+            return self._executor
+
+    def _start(self, plan: RegenerationPlan) -> Optional[Future]:
+        """Send the uncached part of a plan to the pool; the result is cached when it completes."""
+        pending = plan.pending
+        if pending is None:
+            return None
+        future = self._get_executor().submit(generate_metadata, pending)
+
+        def store(done: Future):
+            if not done.cancelled() and done.exception() is None:
+                self.cache.store(plan, done.result())
+        future.add_done_callback(store)
+        return future
+
+    def run(self, request: dict) -> Future:
+        """Regenerate a single request without recording a job; returns a future of the assembled metadata."""
+        plan = self.cache.plan(request, bypass=request.get("bypassCache", False))
+        result = Future()
+        future = self._start(plan)
+        if future is None:
+            result.set_result(plan.assemble())
+            return result
+
+        def assemble(done: Future):
+            if done.cancelled():
+                result.cancel()
+            elif done.exception() is not None:
+                result.set_exception(done.exception())
+            else:
+                result.set_result(plan.assemble(done.result()))
+        future.add_done_callback(assemble)
+        return result
+
+    def submit(self, requests: List[dict]) -> RegenerationJob:
+        with self._lock:
+            unfinished = sum(1 for job in self._active.values() if not job.done)
+            if unfinished >= self.max_jobs:
+                raise RegenerationQueueFull(f"{unfinished} regeneration jobs are already running on this worker")
+            job = RegenerationJob(requests)
+            self._active[job.id] = job
+        try:
+            for request in requests:
+                plan = self.cache.plan(request, bypass=request.get("bypassCache", False))
+                job.items.append((plan, self._start(plan)))
+        except BaseException:
+            # e.g. the pool was shut down: drop the job and whatever part of it already started
+            for _, future in job.items:
+                if future is not None:
+                    future.cancel()
+            with self._lock:
+                self._active.pop(job.id, None)
+            raise
+        self._prune_expired()
+        self._store(job)
+        for _, future in job.items:
+            if future is not None:
+                future.add_done_callback(lambda _, job=job: self._store(job))
+        cached = sum(1 for _, future in job.items if future is None)
+        logger.info(f"Submitted regeneration job {job.id} for {len(requests)} assets ({cached} served from cache).")
+        return job
+
+    def _store(self, job: RegenerationJob):
+        """Write the job's current state; once it is done, also its results, and stop tracking it locally."""
+        with self._store_lock:
+            summary = job.summary()
+            done = job.done
+            now = datetime.utcnow()
+            db = self.session_factory()
+            try:
+                record = db.get(RegenerationJobRecord, job.id)
+                if record is None:
+                    record = RegenerationJobRecord(id=job.id, owner=self.owner, created_at=datetime.utcfromtimestamp(job.created_at))
+                    db.add(record)
+                record.status = summary["status"]
+                record.item_counts = json.dumps(summary["items"])
+                record.updated_at = now
+                if done:
+                    record.results = json.dumps(job.results())
+                    record.finished_at = now
+                db.commit()
+            except SQLAlchemyError as e:
+                db.rollback()
+                logger.error(f"Failed to store the state of regeneration job {job.id}: {str(e)}")
+                if done:
+                    # Nothing writes a finished job again: keep it for polls on this worker only
+                    self._unstored.set(job.id, job)
+            finally:
+                db.close()
+                if done:
+                    with self._lock:
+                        self._active.pop(job.id, None)
+
+    def _prune_expired(self):
+        db = self.session_factory()
+        try:
+            oldest = datetime.utcnow() - timedelta(seconds=self.result_ttl)
+            db.query(RegenerationJobRecord).filter(RegenerationJobRecord.finished_at < oldest).delete(synchronize_session=False)
+            db.commit()
+        except SQLAlchemyError as e:
+            db.rollback()
+            logger.warning(f"Failed to prune expired regeneration jobs: {str(e)}")
+        finally:
+            db.close()
+
+    def _load(self, job_id: str) -> Optional[RegenerationJobRecord]:
+        db = self.session_factory()
+        try:
+            record = db.get(RegenerationJobRecord, job_id)
+        finally:
+            db.close()
+        if record is None:
+            return None
+        if record.finished_at is not None and (datetime.utcnow() - record.finished_at).total_seconds() > self.result_ttl:
+            return None
+        return record
+
+    def _local(self, job_id: str) -> Optional[RegenerationJob]:
+        with self._lock:
+            job = self._active.get(job_id)
+        return job if job is not None else self._unstored.get(job_id)
+
+    def summary(self, job_id: str) -> Optional[dict]:
+        """Status of a job run by any worker, or None if it is unknown or expired."""
+        job = self._local(job_id)
+        if job is not None:
+            return job.summary()
+        record = self._load(job_id)
+        if record is None:
+            return None
+        return {
+            "jobId": record.id,
+            "status": record.status,
+            "createdAt": _epoch(record.created_at),
+            "items": json.loads(record.item_counts or "{}"),
+        }
+
+    def results(self, job_id: str) -> Optional[List[dict]]:
+        """Per-asset results of a finished job, or None while it is unfinished (or unknown)."""
+        job = self._local(job_id)
+        if job is not None:
+            return job.results() if job.done else None
+        record = self._load(job_id)
+        if record is None or record.results is None:
+            return None
+        return json.loads(record.results)
+
+    def stats(self) -> dict:
+        with self._lock:
+            active = sum(1 for job in self._active.values() if not job.done)
+        return {
+            "executor": self.executor_kind,
+            "max_workers": self.max_workers,
+            "active_jobs": active,
+            "max_jobs": self.max_jobs,
+            "unstored_jobs": len(self._unstored),
+        }
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+            jobs = list(self._active.values())
+        # Record the queued items cancelled above, so polls on other workers do not wait for them forever
+        for job in jobs:
+            self._store(job)
+
+regeneration_cache = RegenerationCache(ttl=settings.REGENERATION_CACHE_TTL, maxsize=settings.REGENERATION_CACHE_MAXSIZE)
+register_metrics("regeneration_cache", regeneration_cache.stats)
+
+regeneration_jobs = RegenerationJobManager(
+    regeneration_cache,
+    executor_kind=settings.REGENERATION_EXECUTOR,
+    max_workers=settings.REGENERATION_MAX_WORKERS,
+    result_ttl=settings.REGENERATION_JOB_TTL,
+    max_jobs=settings.REGENERATION_MAX_JOBS,
+)
+register_metrics("regeneration_jobs", regeneration_jobs.stats)
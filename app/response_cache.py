@@ -0,0 +1,101 @@
+# app/response_cache.py
+import hashlib
+import json
+from typing import Callable, Iterable, Optional, Union
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from app.cache import TTLCache
+from app.config import settings
+from app.metrics import register_metrics
+
+class CachedResponse:
+    """A JSON response body encoded once, with its strong ETag and the tags it can be invalidated by."""
+
+    def __init__(self, body: bytes, tags: Iterable[str], headers: Optional[dict] = None):
+        self.body = body
+        self.etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+        self.tags = frozenset(tags)
+        self.headers = headers or {}
+
+    def matches(self, if_none_match: Optional[str]) -> bool:
+        if not if_none_match:
+            return False
+        if if_none_match.strip() == "*":
+            return True
+        # Weak comparison, as RFC 9110 requires for If-None-Match
+        candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return self.etag in candidates
+
+    def to_response(self, request: Request, cache_control: str) -> Response:
+        headers = {**self.headers, "ETag": self.etag, "Cache-Control": cache_control}
+        if self.matches(request.headers.get("if-none-match")):
+            return Response(status_code=304, headers=headers)
+        return Response(content=self.body, media_type="application/json", headers=headers)
+
+class ResponseCache:
+    """
+    Caches the encoded bodies of our own GET responses, keyed by path and query string.
+    Entries carry tags (e.g. "asset:<id>", "team:<name>", "unowned-assets") so writes
+    made through the API can drop exactly the responses they affect.
+    """
+
+    def __init__(self, ttl: float, maxsize: int):
+        self._entries = TTLCache(ttl=ttl, maxsize=maxsize)
+        self.not_modified = 0
+
+    @staticmethod
+    def _key(request: Request) -> tuple:
+        return request.url.path, str(request.url.query)
+
+    def serve(
+        self,
+        request: Request,
+        build: Callable[[], object],
+        tags: Union[Iterable[str], Callable[[object], Iterable[str]]],
+        cache_control: str,
+        headers: Callable[[], dict] = None,
+        cache_if: Callable[[object], bool] = None
+    ) -> Response:
+        """
+        Answer from the cache, or call build() and cache its JSON encoding.
+        tags may be a function of the built content; headers() supplies extra response
+        headers stored with the body; content failing cache_if is served but not cached.
+        Exceptions from build() propagate and nothing is cached.
+        """
+        key = self._key(request)
+        entry = self._entries.get(key)
+        if entry is None:
+            content = build()
+            body = json.dumps(jsonable_encoder(content), separators=(",", ":")).encode("utf-8")
+            entry = CachedResponse(body, tags(content) if callable(tags) else tags, headers() if headers else None)
+            if cache_if is None or cache_if(content):
+                self._entries.set(key, entry)
+        response = entry.to_response(request, cache_control)
+        if response.status_code == 304:
+            self.not_modified += 1
+        return response
+
+    def invalidate_tags(self, *tags: str):
+        """Drop every cached response carrying any of the given tags."""
+        tags = set(tags)
+        self._entries.invalidate_matching(lambda _, entry: not tags.isdisjoint(entry.tags))
+
+    def invalidate_asset(self, asset_id: str, team: Optional[str] = None):
+        """
+        Drop the responses that may show an asset after it was created, claimed, updated or deleted.
+        Pass the team that now owns it, so that team's listing picks the asset up.
+        """
+        self.invalidate_assets([asset_id], team=team)
+
+    def invalidate_assets(self, asset_ids: Iterable[str], team: Optional[str] = None):
+        """invalidate_asset() for many assets at once, in a single pass over the cache."""
+        tags = [f"asset:{asset_id}" for asset_id in asset_ids if asset_id] + ["unowned-assets"]
+        if team:
+            tags.append(f"team:{team}")
+        self.invalidate_tags(*tags)
+
+    def stats(self) -> dict:
+        return {**self._entries.stats(), "not_modified": self.not_modified}
+
+response_cache = ResponseCache(ttl=settings.RESPONSE_CACHE_TTL, maxsize=settings.RESPONSE_CACHE_MAXSIZE)
+register_metrics("response_cache", response_cache.stats)
@@ -2,14 +2,21 @@
 
 from datetime import datetime, timedelta
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Body, Path
+from fastapi import APIRouter, Depends, HTTPException, Body, Path, Query, Request
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from app.database import get_db
-from app.models import User
+from app.principal_cache import UserSnapshot
 from app.utils import get_current_user, get_headers
 from app.asset_handlers import asset_handler_registry
+from app.bulkhead import enter_bulk_lane, run_in_bulk_threadpool
 from app.config import settings
+from app.deadline import deadline_expired, extend_default_deadline
+from app.entity_cache import entity_cache
+from app.ingestion_fingerprints import forget_fingerprints, load_fingerprints, save_fingerprints
+from app.response_cache import response_cache
+import asyncio
 import logging
 import requests
 
@@ -21,6 +28,9 @@ router = APIRouter(
 
 logger = logging.getLogger(__name__)
 
+# Clients may keep a copy but must revalidate it (cheaply, via If-None-Match) before each use
+ASSET_CACHE_CONTROL = "private, no-cache"
+
 class AssetUpdateModel(BaseModel):
     displayName: Optional[str] = None
     description: Optional[str] = None
@@ -39,18 +49,40 @@ class AssetDataModel(BaseModel):
     databaseName: Optional[str] = None
     databaseSchemaName: Optional[str] = None
 
+def prepare_asset_data(asset: AssetDataModel) -> dict:
+    """Handler input of an uploaded asset, with the default parent entities filled in."""
+    asset_data = asset.dict()
+    asset_data.setdefault('service_name', 'default_service')
+    asset_data.setdefault('database_name', 'default_database')
+    asset_data.setdefault('schema_name', 'default_schema')
+    return asset_data
+
 @router.post("/upload_assets", summary="Upload assets from data", description="Create assets in OpenMetadata based on uploaded data.")
 async def upload_assets(
     assets: List[AssetDataModel],
+    force: bool = Query(False, description="Write every table, even those unchanged since their last upload"),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserSnapshot = Depends(get_current_user)
 ):
     logger.debug(f"Assets received: {assets}")
+    # Uploads are bulk traffic: own upstream lane and worker threads, so interactive routes keep theirs
+    enter_bulk_lane()
+    extend_default_deadline(settings.BULK_REQUEST_DEADLINE_SECONDS)
 
-    created_assets = []
-    errors = []
+    handler_class = asset_handler_registry["tables"]
+    assets_data = [prepare_asset_data(asset) for asset in assets]
+
+    # Resolve the OpenMetadata headers and the fingerprints of previous uploads once, off the event loop;
+    # the handlers then never use the DB session
+    headers = await run_in_threadpool(get_headers, db)
+    known_fingerprints = {} if force else await run_in_threadpool(
+        load_fingerprints, db, [handler_class.table_fqn(asset_data) for asset_data in assets_data]
+    )
 
-    for asset in assets:
+    def process_asset(asset: AssetDataModel, asset_data: dict) -> dict:
+        if deadline_expired():
+            # Fail fast instead of starting another chain of upstream calls
+            return {"success": False, "errors": [f"Skipped asset '{asset.title}': request deadline exceeded"]}
         try:
             # Ensure that attributes and att_desc are not empty
             if not asset.attributes:
@@ -58,36 +90,69 @@ async def upload_assets(
             if not asset.att_desc:
                 logger.warning(f"No attribute descriptions provided for asset '{asset.title}'.")
 
-            # Prepare asset data
-            asset_data = asset.dict()
-
-            # Set default parent entities if not provided
-            asset_data.setdefault('service_name', 'default_service')
-            asset_data.setdefault('database_name', 'default_database')
-            asset_data.setdefault('schema_name', 'default_schema')
-
             # Initialize the asset handler
-            handler_class = asset_handler_registry["tables"]
-            handler = handler_class(db=db, asset_data=asset_data, current_user=current_user)
+            handler = handler_class(
+                db=db,
+                asset_data=asset_data,
+                current_user=current_user,
+                headers=headers,
+                force=force,
+                known_fingerprints=known_fingerprints,
+            )
 
             # Process the asset creation or update
-            result = handler.handle()
-
-            if result.get('success'):
-                created_assets.extend(result.get('created_assets', []))
-                logger.info(f"Asset '{asset.title}' created or updated successfully.")
-            else:
-                errors.extend(result.get('errors', []))
-                logger.error(f"Failed to create or update asset '{asset.title}': {result['errors']}")
+            return handler.handle()
 
         except Exception as e:
             error_msg = f"Error creating asset '{asset.title}': {str(e)}"
-            errors.append(error_msg)
             logger.exception(error_msg)
+            return {"success": False, "errors": [error_msg]}
+
+    # Bound the number of assets whose upstream calls are in flight at once
+    semaphore = asyncio.Semaphore(settings.UPLOAD_MAX_CONCURRENCY)
+
+    async def process_asset_in_threadpool(asset: AssetDataModel, asset_data: dict) -> dict:
+        async with semaphore:
+            # All blocking work (handler setup and upstream calls) runs off the event loop
+            return await run_in_bulk_threadpool(process_asset, asset, asset_data)
+
+    # gather() keeps results in input order regardless of completion order
+    results = await asyncio.gather(*(
+        process_asset_in_threadpool(asset, asset_data) for asset, asset_data in zip(assets, assets_data)
+    ))
+
+    created_assets = []
+    errors = []
+    skipped = 0
+    fingerprints = []
+
+    for asset, result in zip(assets, results):
+        if result.get('skipped'):
+            skipped += 1
+        elif result.get('success'):
+            created_assets.extend(result.get('created_assets', []))
+            if result.get('fingerprint'):
+                fingerprints.append(result['fingerprint'])
+            logger.info(f"Asset '{asset.title}' created or updated successfully.")
+        else:
+            errors.extend(result.get('errors', []))
+            logger.error(f"Failed to create or update asset '{asset.title}': {result['errors']}")
+
+    # Written tables are owned by the caller's team: drop cached views of them and of that team's listing
+    if created_assets:
+        response_cache.invalidate_assets([table.get("id") for table in created_assets], team=current_user.team)
+
+    # Remember what was written, in one transaction, so the next identical upload skips it
+    try:
+        await run_in_threadpool(save_fingerprints, db, fingerprints)
+    except Exception as e:
+        # The tables were written; failing here only costs a rewrite on the next upload
+        logger.error(f"Failed to save fingerprints of {len(fingerprints)} uploaded tables: {str(e)}")
 
     return {
         "success": not bool(errors),
         "created_assets": created_assets,
+        "skipped": skipped,
         "errors": errors
     }
 
@@ -95,8 +160,9 @@ async def upload_assets(
 def create_asset(
     type: str,
     asset_data: dict = Body(...),
+    force: bool = Query(False, description="Write a table even when it is unchanged since its last upload"),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserSnapshot = Depends(get_current_user)
 ):
     """Create an asset of the specified type in OpenMetadata."""
     if type not in asset_handler_registry:
@@ -104,30 +170,42 @@ def create_asset(
         raise HTTPException(status_code=400, detail="Unsupported asset type")
 
     handler_class = asset_handler_registry[type]
-    handler = handler_class(db=db, asset_data=asset_data, current_user=current_user)
+    # Only tables are fingerprinted
+    options = {"force": force} if type == "tables" else {}
+    handler = handler_class(db=db, asset_data=asset_data, current_user=current_user, **options)
     result = handler.handle()
 
+    if result.get('skipped'):
+        return {"success": True, "skipped": True, "message": f"Asset of type '{type}' is unchanged since its last upload."}
     if result['success']:
-        return {"success": True, "message": f"Asset of type '{type}' created successfully."}
+        response_cache.invalidate_assets(
+            [asset.get("id") for asset in result.get('created_assets', [])], team=current_user.team
+        )
+        if result.get('fingerprint'):
+            try:
+                save_fingerprints(db, [result['fingerprint']])
+            except Exception as e:
+                # The table was written; failing here only costs a rewrite on the next upload
+                logger.error(f"Failed to save the fingerprint of table '{result['fingerprint']['fqn']}': {str(e)}")
+        return {"success": True, "skipped": False, "message": f"Asset of type '{type}' created successfully."}
     else:
         return {"success": False, "errors": result['errors']}
 
 @router.get("/{type}/{asset_id}", summary="Retrieve an asset by ID", description="Retrieve an asset by its ID and type.")
-def get_asset_by_id(type: str, asset_id: str, db: Session = Depends(get_db)):
+def get_asset_by_id(type: str, asset_id: str, request: Request, db: Session = Depends(get_db)):
     """Retrieve an asset by its ID and type."""
     if type not in asset_handler_registry:
         raise HTTPException(status_code=400, detail="Unsupported asset type")
 
-    headers = get_headers(db)
-    url = f"{settings.OPENMETADATA_API_URL}/{type}/{asset_id}"
+    def load_asset() -> dict:
+        headers = get_headers(db)
+        try:
+            return entity_cache.get(type, asset_id, headers)
+        except requests.RequestException as e:
+            logger.error(f"Error fetching asset by ID {asset_id}: {str(e)}")
+            raise HTTPException(status_code=500, detail="Failed to communicate with OpenMetadata API")
 
-    try:
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
-        return response.json()
-    except requests.RequestException as e:
-        logger.error(f"Error fetching asset by ID {asset_id}: {str(e)}")
-        raise HTTPException(status_code=500, detail="Failed to communicate with OpenMetadata API")
+    return response_cache.serve(request, load_asset, tags=[f"asset:{asset_id}"], cache_control=ASSET_CACHE_CONTROL)
 
 @router.patch("/{type}/{asset_id}", summary="Update asset details", description="Partially update asset details in OpenMetadata.")
 def update_asset(
@@ -135,7 +213,7 @@ def update_asset(
     asset_id: str,
     asset_data: AssetUpdateModel = Body(...),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserSnapshot = Depends(get_current_user)
 ):
     """Update an asset's data in OpenMetadata."""
     if type not in asset_handler_registry:
@@ -146,6 +224,8 @@ def update_asset(
     result = handler.update_asset(asset_id)
 
     if result['success']:
+        response_cache.invalidate_asset(asset_id)
+        forget_fingerprints(db, [asset_id])
         return {"success": True, "message": f"Asset '{asset_id}' updated successfully"}
     else:
         raise HTTPException(status_code=500, detail=result['errors'])
@@ -155,7 +235,7 @@ def delete_asset(
     type: str,
     asset_id: str,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserSnapshot = Depends(get_current_user)
 ):
     """Delete an asset by ID if the current user's team owns it."""
     if type not in asset_handler_registry:
@@ -166,6 +246,8 @@ def delete_asset(
     result = handler.delete_asset(asset_id)
 
     if result['success']:
+        response_cache.invalidate_asset(asset_id)
+        forget_fingerprints(db, [asset_id])
         return {"success": True, "message": "Asset deleted successfully"}
     else:
         raise HTTPException(status_code=500, detail=result['errors'])
@@ -176,7 +258,7 @@ def claim_asset_ownership(
     asset_id: str,
     asset_claim: AssetClaimModel = Body(...),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserSnapshot = Depends(get_current_user)
 ):
     """Allow a logged-in user to claim ownership of an asset if it is unowned."""
     if type not in asset_handler_registry:
@@ -187,6 +269,8 @@ def claim_asset_ownership(
     result = handler.claim_asset(asset_id)
 
     if result['success']:
+        response_cache.invalidate_asset(asset_id, team=current_user.team)
+        forget_fingerprints(db, [asset_id])
         return {"success": True, "message": f"Asset {asset_id} claimed successfully"}
     else:
         raise HTTPException(status_code=500, detail=result['errors'])
@@ -1,8 +1,15 @@
 # routers/metadata.py
-from fastapi import APIRouter, Depends, HTTPException
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import and_, or_
 from sqlalchemy.orm import Session
 from .. import schemas
-from ..database import get_db
+from ..config import settings
+from ..database import get_db, get_read_db
 from ..models import Asset, MetadataHistory
 
 router = APIRouter(prefix="/metadata", tags=["metadata"])
@@ -23,7 +30,44 @@ def create_metadata_history(asset_id: int, metadata: schemas.MetadataHistoryCrea
     db.refresh(new_metadata)
     return new_metadata
 
+def encode_history_cursor(entry: MetadataHistory) -> str:
+    state = {"createdAt": entry.created_at.isoformat(), "id": entry.id}
+    return base64.urlsafe_b64encode(json.dumps(state).encode("utf-8")).decode("ascii")
+
+def decode_history_cursor(cursor: str) -> tuple:
+    try:
+        state = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return datetime.fromisoformat(state["createdAt"]), int(state["id"])
+    except (ValueError, TypeError, KeyError, binascii.Error):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
 @router.get("/assets/{asset_id}/metadata_history/", response_model=list[schemas.MetadataHistory])
-def read_metadata_history(asset_id: int, db: Session = Depends(get_db)):
-    metadata_history = db.query(MetadataHistory).filter(MetadataHistory.asset_id == asset_id).all()
+def read_metadata_history(
+    asset_id: int,
+    response: Response,
+    limit: int = Query(settings.METADATA_HISTORY_PAGE_SIZE, ge=1, le=settings.METADATA_HISTORY_MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="Value of `X-Next-Cursor` from the previous page"),
+    since: Optional[datetime] = Query(None, description="Only return entries created at or after this time"),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Return one page of an asset's metadata history, oldest first.
+    Pages are keyed on (created_at, id); when more entries follow, the cursor
+    for the next page is returned in the `X-Next-Cursor` header.
+    """
+    query = db.query(MetadataHistory).filter(MetadataHistory.asset_id == asset_id)
+    if since is not None:
+        query = query.filter(MetadataHistory.created_at >= since)
+    if cursor:
+        after_created_at, after_id = decode_history_cursor(cursor)
+        query = query.filter(or_(
+            MetadataHistory.created_at > after_created_at,
+            and_(MetadataHistory.created_at == after_created_at, MetadataHistory.id > after_id)
+        ))
+
+    # One extra row tells whether another page follows
+    metadata_history = query.order_by(MetadataHistory.created_at, MetadataHistory.id).limit(limit + 1).all()
+    if len(metadata_history) > limit:
+        metadata_history = metadata_history[:limit]
+        response.headers["X-Next-Cursor"] = encode_history_cursor(metadata_history[-1])
     return metadata_history
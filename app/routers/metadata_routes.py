@@ -1,13 +1,28 @@
 # app/routers/metadata_routes.py
-from fastapi import APIRouter, HTTPException, Body
+from fastapi import APIRouter, HTTPException, Body, Depends
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
+from sqlalchemy.orm import Session
 from typing import List
+import asyncio
+import logging
 import requests
-from app.config import settings  # Load settings for API URL and token
+from app.bulkhead import UpstreamOverloaded, enter_bulk_lane, retry_after_header, run_in_bulk_threadpool
+from app.config import settings
+from app.deadline import DeadlineExceeded, extend_default_deadline
+from app.database import get_db
+from app.entity_cache import entity_cache
+from app.ingestion_fingerprints import forget_fingerprints
+from app.openmetadata_client import openmetadata_client
+from app.regeneration import RegenerationQueueFull, regeneration_jobs
+from app.response_cache import response_cache
+from app.utils import get_headers
 
 # Initialize Router
 router = APIRouter()
 
+logger = logging.getLogger(__name__)
+
 # Define Pydantic Models
 class Attribute(BaseModel):
     name: str
@@ -19,31 +34,23 @@ class Metadata(BaseModel):
     attributes: List[Attribute]
     tag: str
 
+class MetadataUpdate(Metadata):
+    assetId: str
+
 class RegenerateRequest(BaseModel):
     assetId: str
     displayName: str
     attributes: List[str]
-
-# OpenMetadata configuration from environment variables or config
-OPENMETADATA_API_URL = settings.OPENMETADATA_API_URL
-API_TOKEN = settings.OPENMETADATA_TOKEN
+    bypassCache: bool = False  # Regenerate everything, ignoring (but refreshing) cached output
 
 @router.get("/metadata/suggestions/{assetId}", response_model=Metadata)
-async def get_metadata_suggestions(assetId: str):
-    """Fetch metadata suggestions from OpenMetadata based on asset ID"""
+def get_metadata_suggestions(assetId: str, db: Session = Depends(get_db)):
+    """Fetch metadata suggestions from OpenMetadata based on asset ID (runs in the threadpool, as it blocks on I/O)"""
     asset_type = "tables"
-    url = f"{OPENMETADATA_API_URL}/{asset_type}/{assetId}"
-    headers = {
-        "Authorization": f"Bearer {API_TOKEN}",
-        "Content-Type": "application/json",
-    }
+    headers = get_headers(db)
 
     try:
-        response = requests.get(url, headers=headers)
-        if response.status_code == 404:
-            raise HTTPException(status_code=404, detail=f"Asset with ID {assetId} not found in OpenMetadata.")
-        response.raise_for_status()
-        data = response.json()
+        data = entity_cache.get(asset_type, assetId, headers)
         metadata = Metadata(
             displayName=data.get("displayName", ""),
             description=data.get("description", ""),
@@ -56,51 +63,49 @@ async def get_metadata_suggestions(assetId: str):
         return metadata
 
     except requests.RequestException as e:
+        if e.response is not None and e.response.status_code == 404:
+            raise HTTPException(status_code=404, detail=f"Asset with ID {assetId} not found in OpenMetadata.") from e
         raise HTTPException(status_code=500, detail="Failed to fetch metadata from OpenMetadata") from e
 
 @router.post("/metadata/regenerate", response_model=Metadata)
 async def regenerate_metadata(request: RegenerateRequest):
-    """Regenerate metadata suggestions using an external Python script (simulated with mock data)"""
-    # Simulate the external script output using mock data
-    # In a real scenario, you would call the external script here
-    external_script_output = {
-        "displayName": request.displayName,
-        "description": f"Regenerated description for {request.displayName}",
-        "attributes": [
-            {"name": attr_name, "description": f"Regenerated description for {attr_name}"}
-            for attr_name in request.attributes
-        ],
-        "tag": "RegeneratedTag"
-    }
-
-    metadata = Metadata(**external_script_output)
-    return metadata
+    """Regenerate metadata suggestions for one asset, waiting for the result from the job pool"""
+    future = regeneration_jobs.run(request.dict())
+    return Metadata(**await asyncio.wrap_future(future))
 
-@router.patch("/metadata/update/{assetId}", response_model=dict)
-async def update_metadata(assetId: str, metadata: Metadata = Body(...)):
-    """Update metadata in OpenMetadata using PATCH"""
-    asset_type = "tables"
-    url = f"{OPENMETADATA_API_URL}/{asset_type}/{assetId}"
-    headers = {
-        "Authorization": f"Bearer {API_TOKEN}",
-        "Content-Type": "application/json-patch+json",
-    }
-
-    # Fetch the current version of the asset to include in If-Match header
+@router.post("/metadata/regenerate/jobs", status_code=202, response_model=dict)
+def submit_regeneration_job(regenerate_requests: List[RegenerateRequest] = Body(...)):
+    """Queue regeneration for one or many assets and return the job id immediately"""
+    if not regenerate_requests:
+        raise HTTPException(status_code=400, detail="At least one regeneration request is required.")
     try:
-        get_response = requests.get(url, headers={"Authorization": f"Bearer {API_TOKEN}"})
-        get_response.raise_for_status()
-        current_asset = get_response.json()
-        current_version = current_asset.get("version")
-        if not current_version:
-            raise HTTPException(status_code=500, detail="Unable to retrieve current asset version.")
-    except requests.RequestException as e:
-        print("Error during GET request:", e)
-        raise HTTPException(status_code=500, detail="Failed to retrieve current asset from OpenMetadata") from e
+        job = regeneration_jobs.submit([request.dict() for request in regenerate_requests])
+    except RegenerationQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers=retry_after_header()) from e
+    return job.summary()
 
-    headers["If-Match"] = str(current_version)
+@router.get("/metadata/regenerate/jobs/{job_id}", response_model=dict)
+def get_regeneration_job(job_id: str):
+    """Return the status of a regeneration job (submitted to any worker) and how many of its assets are in each state"""
+    summary = regeneration_jobs.summary(job_id)
+    if summary is None:
+        raise HTTPException(status_code=404, detail=f"Regeneration job {job_id} not found or expired.")
+    return summary
 
-    # Construct the JSON Patch payload
+@router.get("/metadata/regenerate/jobs/{job_id}/result", response_model=dict)
+def get_regeneration_job_result(job_id: str):
+    """Return the per-asset results of a finished regeneration job"""
+    # Results first: once they exist, the summary read after them is final too
+    results = regeneration_jobs.results(job_id)
+    summary = regeneration_jobs.summary(job_id)
+    if summary is None:
+        raise HTTPException(status_code=404, detail=f"Regeneration job {job_id} not found or expired.")
+    if results is None:
+        raise HTTPException(status_code=409, detail=f"Regeneration job {job_id} is still {summary['status']}.")
+    return {**summary, "results": results}
+
+def build_metadata_patch(current_asset: dict, metadata: Metadata) -> list:
+    """Build the JSON Patch operations that turn current_asset into the given metadata."""
     patch_operations = []
 
     # Update displayName if it differs from the current value
@@ -175,20 +180,103 @@ async def update_metadata(assetId: str, metadata: Metadata = Body(...)):
             "path": "/tags"
         })
 
+    return patch_operations
+
+def apply_metadata_update(assetId: str, metadata: Metadata, read_headers: dict) -> dict:
+    """
+    Fetch the asset, diff it against metadata and PATCH the changes, guarded by If-Match on the fetched version.
+    Raises HTTPException on failure; a 409 means the asset changed between the GET and the PATCH.
+    """
+    asset_type = "tables"
+    path = f"/{asset_type}/{assetId}"
+    headers = {**read_headers, "Content-Type": "application/json-patch+json"}
+
+    # Fetch the current version of the asset to include in If-Match header (always revalidated)
+    try:
+        current_asset = entity_cache.get(asset_type, assetId, read_headers, revalidate=True)
+        current_version = current_asset.get("version")
+        if not current_version:
+            raise HTTPException(status_code=500, detail="Unable to retrieve current asset version.")
+    except DeadlineExceeded as e:
+        raise HTTPException(status_code=504, detail=f"Request deadline exceeded before asset {assetId} was read") from e
+    except UpstreamOverloaded as e:
+        raise HTTPException(status_code=503, detail=str(e), headers=retry_after_header()) from e
+    except requests.RequestException as e:
+        if e.response is not None and e.response.status_code == 404:
+            raise HTTPException(status_code=404, detail=f"Asset with ID {assetId} not found in OpenMetadata.") from e
+        logger.error(f"Error fetching asset {assetId} for metadata update: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to retrieve current asset from OpenMetadata") from e
+
+    headers["If-Match"] = str(current_version)
+
+    # Construct the JSON Patch payload
+    patch_operations = build_metadata_patch(current_asset, metadata)
     if not patch_operations:
         return {"message": "No changes detected."}
 
-    # Debugging output
-    print("Headers for PATCH:", headers)
-    print("Patch Operations:", patch_operations)
+    logger.debug(f"Patch operations for asset {assetId}: {patch_operations}")
 
     # Send the PATCH request to update the asset
     try:
-        response = requests.patch(url, headers=headers, json=patch_operations)
-        print("PATCH Response Status Code:", response.status_code)
-        print("PATCH Response Content:", response.text)
+        response = openmetadata_client.patch(path, headers=headers, json=patch_operations)
+        entity_cache.invalidate(asset_type, assetId)
+        response_cache.invalidate_asset(assetId)
+        if response.status_code in (409, 412):
+            raise HTTPException(
+                status_code=409,
+                detail=f"Asset {assetId} was modified after version {current_version} was read; reload it and retry."
+            )
         response.raise_for_status()
         return {"message": "Metadata updated successfully"}
+    except DeadlineExceeded as e:
+        raise HTTPException(status_code=504, detail=f"Request deadline exceeded while updating asset {assetId}") from e
+    except UpstreamOverloaded as e:
+        raise HTTPException(status_code=503, detail=str(e), headers=retry_after_header()) from e
     except requests.RequestException as e:
-        print("Error during PATCH request:", e)
+        logger.error(f"Error updating metadata of asset {assetId}: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to update metadata in OpenMetadata: {e}") from e
+
+@router.patch("/metadata/update", response_model=dict)
+async def update_metadata_batch(updates: List[MetadataUpdate] = Body(...), db: Session = Depends(get_db)):
+    """
+    Update the metadata of many assets at once, with at most METADATA_UPDATE_MAX_CONCURRENCY in flight.
+    Each asset gets its own outcome (status updated, unchanged, conflict, not_found, timeout, overloaded or failed),
+    in request order. Upstream calls go through the bulk lane and the updates run on the bulk threadpool.
+    """
+    enter_bulk_lane()
+    extend_default_deadline(settings.BULK_REQUEST_DEADLINE_SECONDS)
+    # Resolve the OpenMetadata headers once, off the event loop; the updates never use the DB session
+    read_headers = await run_in_threadpool(get_headers, db)
+    semaphore = asyncio.Semaphore(settings.METADATA_UPDATE_MAX_CONCURRENCY)
+
+    async def update_one(update: MetadataUpdate) -> dict:
+        async with semaphore:
+            try:
+                result = await run_in_bulk_threadpool(apply_metadata_update, update.assetId, update, read_headers)
+            except HTTPException as e:
+                status = {404: "not_found", 409: "conflict", 503: "overloaded", 504: "timeout"}.get(e.status_code, "failed")
+                return {"assetId": update.assetId, "status": status, "statusCode": e.status_code, "message": e.detail}
+            except Exception as e:
+                logger.exception(f"Unexpected error updating metadata of asset {update.assetId}")
+                return {"assetId": update.assetId, "status": "failed", "statusCode": 500, "message": str(e)}
+        status = "unchanged" if result["message"] == "No changes detected." else "updated"
+        return {"assetId": update.assetId, "status": status, "statusCode": 200, "message": result["message"]}
+
+    # gather() keeps results in input order regardless of completion order
+    results = await asyncio.gather(*(update_one(update) for update in updates))
+    # Updated tables no longer match their last upload
+    await run_in_threadpool(forget_fingerprints, db, [r["assetId"] for r in results if r["status"] == "updated"])
+
+    summary = {}
+    for result in results:
+        summary[result["status"]] = summary.get(result["status"], 0) + 1
+    return {"success": all(r["statusCode"] == 200 for r in results), "summary": summary, "results": results}
+
+@router.patch("/metadata/update/{assetId}", response_model=dict)
+def update_metadata(assetId: str, metadata: Metadata = Body(...), db: Session = Depends(get_db)):
+    """Update metadata in OpenMetadata using PATCH (runs in the threadpool, as it blocks on I/O)"""
+    result = apply_metadata_update(assetId, metadata, get_headers(db))
+    if result["message"] != "No changes detected.":
+        # The table no longer matches its last upload
+        forget_fingerprints(db, [assetId])
+    return result
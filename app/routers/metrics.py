@@ -0,0 +1,12 @@
+# app/routers/metrics.py
+from fastapi import APIRouter
+from app.metrics import collect_metrics
+
+router = APIRouter(
+    prefix="/metrics",
+    tags=["Metrics"]
+)
+
+@router.get("/", summary="Service metrics", description="Cache, pool and upstream counters collected in this worker process.")
+def get_metrics():
+    return collect_metrics()
@@ -1,12 +1,15 @@
 # app/routers/team_assets.py
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from datetime import datetime
 from app.database import get_db
-from app.models import Asset, Settings  # Ensure Settings is imported
+from app.models import Asset
+from app.utils import get_headers
 import requests
 import logging
-from app.config import settings  # Import settings for configuration
+from app.openmetadata_client import openmetadata_client
+from app.response_cache import response_cache
 
 router = APIRouter(
     prefix="/team-assets",
@@ -16,29 +19,36 @@ router = APIRouter(
 # Configure logger
 logger = logging.getLogger(__name__)
 
-# Use settings from config.py for OpenMetadata API URL
-OPENMETADATA_API_URL = settings.OPENMETADATA_API_URL
-
-def get_headers(db: Session):
-    """Retrieve the OpenMetadata API token from the database."""
-    settings_entry = db.query(Settings).first()
-    if settings_entry and settings_entry.openmetadata_token:
-        return {"Authorization": f"Bearer {settings_entry.openmetadata_token}", "Content-Type": "application/json"}
-    raise HTTPException(status_code=500, detail="OpenMetadata API token is not configured")
+# Pollers may reuse a response briefly, then revalidate it with If-None-Match
+TEAM_ASSETS_CACHE_CONTROL = "private, max-age=10"
 
 @router.get("/{team_name}")
-def get_team_assets(team_name: str, db: Session = Depends(get_db)):
-    headers = get_headers(db)
-    team_url = f"{OPENMETADATA_API_URL}/teams/name/{team_name}?fields=owns"
+def get_team_assets(team_name: str, request: Request, db: Session = Depends(get_db)):
+    """Return the assets owned by a team, syncing them into the local asset table."""
+    return response_cache.serve(
+        request,
+        lambda: sync_team_assets(team_name, db),
+        tags=lambda result: [f"team:{team_name}", *(f"asset:{asset['id']}" for asset in result["team_assets"])],
+        cache_control=TEAM_ASSETS_CACHE_CONTROL,
+    )
 
+def sync_team_assets(team_name: str, db: Session, retry: bool = True) -> dict:
+    headers = get_headers(db)
     try:
-        response = requests.get(team_url, headers=headers)
+        response = openmetadata_client.get(f"/teams/name/{team_name}", params={"fields": "owns"}, headers=headers)
         if response.status_code != 200:
             logger.error(f"Failed to fetch team '{team_name}': {response.text}")
             raise HTTPException(status_code=response.status_code, detail="Error fetching team data")
 
         team_data = response.json()
         team_assets = team_data.get("owns", [])
+
+        # Load every already-known asset with a single IN query instead of one query per asset
+        asset_ids = [asset["id"] for asset in team_assets]
+        existing_assets = {
+            asset_entry.id: asset_entry
+            for asset_entry in db.query(Asset).filter(Asset.id.in_(asset_ids))
+        } if asset_ids else {}
         updated_assets = []
 
         for asset in team_assets:
@@ -46,8 +56,9 @@ def get_team_assets(team_name: str, db: Session = Depends(get_db)):
             display_name = asset.get("displayName", asset.get("name", "Unnamed Asset"))
             description = asset.get("description", "No description available")
             updated_at = datetime.utcfromtimestamp(asset.get("updatedAt", 0) / 1000) if asset.get("updatedAt") else None
+            asset_type = asset.get("type", "Unknown Type")  # Default type if not specified
 
-            asset_entry = db.query(Asset).filter_by(id=asset["id"]).first()
+            asset_entry = existing_assets.get(asset["id"])
             if asset_entry is None:
                 # If the asset does not exist, create a new entry in the database
                 asset_entry = Asset(
@@ -56,14 +67,38 @@ def get_team_assets(team_name: str, db: Session = Depends(get_db)):
                     description=description,
                     updated_at=updated_at,  # Store None if 'updatedAt' is missing
                     owner_team=team_name,
-                    type=asset.get("type", "Unknown Type")  # Default type if not specified
+                    type=asset_type
                 )
                 db.add(asset_entry)
-                db.commit()
-                db.refresh(asset_entry)
+                existing_assets[asset["id"]] = asset_entry
+            else:
+                # Only touch the columns that changed upstream, so unchanged rows are not rewritten
+                changes = {
+                    "display_name": display_name,
+                    "description": description,
+                    "owner_team": team_name,
+                    "type": asset_type,
+                }
+                if updated_at is not None:
+                    changes["updated_at"] = updated_at
+                for column, value in changes.items():
+                    if getattr(asset_entry, column) != value:
+                        setattr(asset_entry, column, value)
             updated_assets.append(asset_entry)
 
-        return {"team_assets": [asset.to_dict() for asset in updated_assets]}
+        # Write all new and changed rows in one batched flush and a single transaction
+        try:
+            db.flush()
+        except IntegrityError:
+            if not retry:
+                raise
+            # A concurrent request inserted some of these assets first; redo the sync against its rows
+            db.rollback()
+            logger.info(f"Concurrent insert while syncing assets of team '{team_name}'; retrying.")
+            return sync_team_assets(team_name, db, retry=False)
+        result = {"team_assets": [asset.to_dict() for asset in updated_assets]}
+        db.commit()
+        return result
 
     except requests.RequestException as e:
         logger.error(f"Error communicating with OpenMetadata API: {str(e)}")
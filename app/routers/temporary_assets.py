@@ -14,7 +14,7 @@ router = APIRouter(
 logger = logging.getLogger(__name__)
 
 @router.post("/")
-async def create_temporary_asset(
+def create_temporary_asset(
     data: dict = Body(...), db: Session = Depends(get_db)
 ):
     """
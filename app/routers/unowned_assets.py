@@ -1,10 +1,30 @@
 # app/routers/unowned_assets.py
 
-from fastapi import APIRouter, Depends, HTTPException
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from app.database import get_db
-from app.config import settings  # Import settings from config.py
-from app.models import Settings
+from app.config import settings
+from app.database import get_read_db, ReadSessionLocal
+from app.deadline import current_deadline
+from app.response_cache import response_cache
+from app.unowned_catalog import (
+    asset_type_map,
+    iter_unowned_pages,
+    get_index_refreshed_at,
+    query_index_page,
+    iter_index,
+    unowned_index_refresher
+)
+from app.upstream_trace import submit_in_context
+from app.utils import get_headers
+import base64
+import binascii
+import json
+import queue
+import threading
 import requests
 import logging
 
@@ -16,63 +36,265 @@ router = APIRouter(
 
 logger = logging.getLogger(__name__)
 
-# Mapping for asset types in OpenMetadata
-asset_type_map = {
-    "searchIndexes": "searchIndexes",
-    "tables": "tables",
-    "dashboards": "dashboards"
-}
-
-def get_openmetadata_token(db: Session):
-    """Retrieve OpenMetadata token from the database settings."""
-    settings_entry = db.query(Settings).first()
-    if settings_entry and settings_entry.openmetadata_token:
-        return settings_entry.openmetadata_token
-    logger.error("OpenMetadata API token not found in the database.")
-    raise HTTPException(status_code=500, detail="OpenMetadata API token is not configured in the database")
-
-def get_headers(db: Session):
-    """Generate headers for OpenMetadata API requests."""
-    token = get_openmetadata_token(db)
-    return {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
+# Paged responses may be reused briefly by clients, then revalidated with If-None-Match
+UNOWNED_ASSETS_CACHE_CONTROL = "private, max-age=30"
 
-@router.get("/", summary="Fetch all unowned assets", description="Retrieve a list of all assets that currently have no owner in OpenMetadata.")
-def fetch_unowned_assets(db: Session = Depends(get_db)):
-    """Fetch unowned assets for each specified asset type in OpenMetadata."""
-    headers = get_headers(db)
-    unowned_assets = []
+def encode_cursor(state: dict) -> str:
+    return base64.urlsafe_b64encode(json.dumps(state).encode("utf-8")).decode("ascii")
+
+def decode_cursor(cursor: str) -> dict:
+    try:
+        state = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except (ValueError, binascii.Error):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(state, dict) or state.get("type") not in asset_type_map:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if state.get("src") == "index" and not isinstance(state.get("id"), str):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return state
+
+def _next_type_cursor(asset_type: str) -> Optional[str]:
+    """Cursor pointing at the start of the asset type following asset_type, or None at the end."""
+    types = list(asset_type_map)
+    index = types.index(asset_type) + 1
+    if index < len(types):
+        return encode_cursor({"type": types[index], "after": None, "skip": 0})
+    return None
+
+def fetch_unowned_page(headers: dict, limit: int, cursor: Optional[str]) -> dict:
+    """
+    Return up to `limit` unowned assets starting at `cursor`.
+    The cursor records the asset type, the upstream page cursor and how many
+    unowned assets of that page were already returned.
+    """
+    state = decode_cursor(cursor) if cursor else {"type": next(iter(asset_type_map)), "after": None, "skip": 0}
+    types = list(asset_type_map)
+    results = []
+    errors = []
+
+    for asset_type in types[types.index(state["type"]):]:
+        resume = asset_type == state["type"]
+        skip = state.get("skip", 0) if resume else 0
+        after = state.get("after") if resume else None
 
+        try:
+            for assets, page_after, next_after in iter_unowned_pages(asset_type, headers, after):
+                assets = assets[skip:]
+                room = limit - len(results)
+                if len(assets) > room:
+                    results.extend(assets[:room])
+                    return {
+                        "data": results,
+                        "nextCursor": encode_cursor({"type": asset_type, "after": page_after, "skip": skip + room}),
+                        "errors": errors
+                    }
+                results.extend(assets)
+                skip = 0
+
+                if len(results) == limit:
+                    if next_after:
+                        next_cursor = encode_cursor({"type": asset_type, "after": next_after, "skip": 0})
+                    else:
+                        next_cursor = _next_type_cursor(asset_type)
+                    return {"data": results, "nextCursor": next_cursor, "errors": errors}
+        except requests.RequestException as e:
+            # Report the failed type and carry on with the remaining ones
+            logger.error(f"Error fetching unowned assets of type {asset_type}: {str(e)}")
+            errors.append({"dataType": asset_type, "error": str(e)})
+
+    return {"data": results, "nextCursor": None, "errors": errors}
+
+def _put_until_cancelled(pages: queue.Queue, item: tuple, cancelled: threading.Event) -> bool:
+    while not cancelled.is_set():
+        try:
+            pages.put(item, timeout=0.5)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+def _prefetch_pages(asset_type: str, headers: dict, pages: queue.Queue, cancelled: threading.Event):
+    """Producer: push the pages of one asset type into a bounded queue, then a final done/error marker."""
+    # A full scan streams for as long as it needs; each upstream call still has its own timeout
+    current_deadline.set(None)
     try:
-        for asset_type, endpoint in asset_type_map.items():
-            url = f"{settings.OPENMETADATA_API_URL}/{endpoint}?fields=owners,fullyQualifiedName,displayName,updatedAt&limit=1000000"
-            logger.info(f"Fetching unowned assets of type {asset_type} from {url}")
-
-            response = requests.get(url, headers=headers)
-            if response.status_code != 200:
-                logger.warning(f"Failed to fetch unowned assets for type {asset_type}: {response.text}")
-                continue
-
-            # Collect assets that have no owner
-            assets = [
-                {
-                    "id": item["id"],
-                    "displayName": item.get("displayName", item["name"]),
-                    "updatedAt": item["updatedAt"],
-                    "dataType": asset_type,
-                    "fullyQualifiedName": item["fullyQualifiedName"]
-                }
-                for item in response.json().get("data", [])
-                if not item.get("owners")
-            ]
-            unowned_assets.extend(assets)
-
-        if not unowned_assets:
-            logger.info("No unowned assets found across all asset types.")
+        for assets, _, _ in iter_unowned_pages(asset_type, headers):
+            if not _put_until_cancelled(pages, ("page", assets), cancelled):
+                return
+        _put_until_cancelled(pages, ("done", None), cancelled)
+    except Exception as e:
+        _put_until_cancelled(pages, ("error", str(e)), cancelled)
+
+def iter_unowned_assets_parallel(headers: dict):
+    """
+    Scan all asset types concurrently (at most UNOWNED_ASSETS_MAX_PARALLEL at once).
+    Yields ("page", asset_type, assets) and ("error", asset_type, message) items in
+    asset_type_map order, so the merged output is deterministic.
+    """
+    cancelled = threading.Event()
+    queues = {
+        asset_type: queue.Queue(maxsize=settings.UNOWNED_ASSETS_PREFETCH_PAGES)
+        for asset_type in asset_type_map
+    }
+    # Per-request executor: producers block on their bounded queue, so they must never wait behind other requests
+    executor = ThreadPoolExecutor(max_workers=settings.UNOWNED_ASSETS_MAX_PARALLEL, thread_name_prefix="unowned-scan")
+    try:
+        # Types are submitted in consumption order, so a smaller cap cannot deadlock the consumer
+        for asset_type, pages in queues.items():
+            submit_in_context(executor, _prefetch_pages, asset_type, headers, pages, cancelled)
+
+        for asset_type, pages in queues.items():
+            while True:
+                kind, payload = pages.get()
+                if kind == "done":
+                    break
+                yield kind, asset_type, payload
+                if kind == "error":
+                    break
+    finally:
+        cancelled.set()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+def stream_unowned_assets(headers: dict, output_format: str):
+    """
+    Yield the unowned assets of every type as a JSON array or as NDJSON, one upstream page at a time.
+    A failing asset type does not stop the others: it is logged and reported in the stream itself as
+    a {"dataType": ..., "error": ...} element (array item or NDJSON record), since the status line
+    has already been sent.
+    """
+    count = 0
+    written = False  # Whether the JSON array already has an element, so the next one needs a comma
+    if output_format == "json":
+        yield "["
+    for kind, asset_type, payload in iter_unowned_assets_parallel(headers):
+        if kind == "error":
+            logger.error(f"Error fetching unowned assets of type {asset_type}: {payload}")
+            elements = [{"dataType": asset_type, "error": payload}]
+        elif payload:
+            elements = payload
+            count += len(payload)
+        else:
+            continue
+        if output_format == "ndjson":
+            yield "".join(json.dumps(element) + "\n" for element in elements)
         else:
-            logger.info(f"Successfully fetched {len(unowned_assets)} unowned assets.")
+            yield ("," if written else "") + ",".join(json.dumps(element) for element in elements)
+            written = True
+    if output_format == "json":
+        yield "]"
+
+    if not count:
+        logger.info("No unowned assets found across all asset types.")
+    else:
+        logger.info(f"Successfully streamed {count} unowned assets.")
+
+def fetch_index_page(db: Session, limit: int, cursor_state: Optional[dict]) -> dict:
+    """Return up to `limit` unowned assets from the local index, continuing after a keyset cursor."""
+    after_type = cursor_state["type"] if cursor_state else None
+    after_id = cursor_state["id"] if cursor_state else None
+    rows = query_index_page(db, limit + 1, after_type, after_id)
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor({"src": "index", "type": rows[-1].data_type, "id": rows[-1].id})
+    return {"data": [row.to_dict() for row in rows], "nextCursor": next_cursor, "errors": []}
+
+def stream_index(output_format: str):
+    """Yield every indexed unowned asset as a JSON array or as NDJSON."""
+    # The stream outlives the request's dependencies, so it uses its own session
+    db = ReadSessionLocal()
+    try:
+        count = 0
+        chunk = []
+        if output_format == "json":
+            yield "["
+        for row in iter_index(db, settings.UNOWNED_ASSETS_PAGE_SIZE):
+            if output_format == "ndjson":
+                chunk.append(json.dumps(row.to_dict()) + "\n")
+            else:
+                chunk.append(("," if count else "") + json.dumps(row.to_dict()))
+            count += 1
+            # Send one chunk per batch of rows rather than one per row
+            if len(chunk) >= settings.UNOWNED_ASSETS_PAGE_SIZE:
+                yield "".join(chunk)
+                chunk = []
+        if chunk:
+            yield "".join(chunk)
+        if output_format == "json":
+            yield "]"
+        logger.info(f"Successfully streamed {count} unowned assets from the local index.")
+    finally:
+        db.close()
+
+def _index_refreshed_at(db: Session) -> Optional[datetime]:
+    """
+    Return the index freshness if the index can serve requests, or None to fall back to a live scan.
+    Stale or missing data triggers a background refresh (stale-while-revalidate).
+    """
+    if not settings.UNOWNED_ASSETS_INDEX_ENABLED:
+        return None
+    refreshed_at = get_index_refreshed_at(db)
+    if refreshed_at is None:
+        unowned_index_refresher.trigger()
+    elif (datetime.utcnow() - refreshed_at).total_seconds() > settings.UNOWNED_ASSETS_MAX_AGE:
+        logger.info(f"Unowned-asset index is stale (refreshed at {refreshed_at}); refreshing in the background.")
+        unowned_index_refresher.trigger()
+    return refreshed_at
+
+@router.get("/", summary="Fetch all unowned assets", description="Retrieve a list of all assets that currently have no owner in OpenMetadata.")
+def fetch_unowned_assets(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=10000, description="Return one page of this size with a `nextCursor`"),
+    cursor: Optional[str] = Query(None, description="Cursor returned by a previous paged call"),
+    format: Literal["json", "ndjson"] = Query("json", description="Streaming format when no `limit` is given"),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Fetch unowned assets for each specified asset type.
+    Results come from the locally materialized index once it has been populated, with its
+    refresh time in the `X-Index-Refreshed-At` header; until then OpenMetadata is scanned live.
+    Without `limit`/`cursor` every unowned asset is streamed; with them a single page is
+    returned together with the cursor for the next one. Pages are cached as encoded JSON
+    with an ETag, and dropped when the index is refreshed or an asset is claimed.
+    """
+    cursor_state = decode_cursor(cursor) if cursor else None
+    media_type = "application/x-ndjson" if format == "ndjson" else "application/json"
+
+    def resolve_refreshed_at() -> Optional[datetime]:
+        # Live cursors keep paging upstream even if the index became available meanwhile
+        refreshed_at = None
+        if cursor_state is None or cursor_state.get("src") == "index":
+            refreshed_at = _index_refreshed_at(db)
+        if cursor_state is not None and cursor_state.get("src") == "index" and refreshed_at is None:
+            raise HTTPException(status_code=400, detail="Index cursor is no longer valid")
+        return refreshed_at
+
+    if limit is not None or cursor is not None:
+        freshness = {}
+
+        def build_page() -> dict:
+            refreshed_at = resolve_refreshed_at()
+            if refreshed_at is not None:
+                freshness["X-Index-Refreshed-At"] = refreshed_at.isoformat() + "Z"
+                page = fetch_index_page(db, limit or settings.UNOWNED_ASSETS_PAGE_SIZE, cursor_state)
+                page["refreshedAt"] = freshness["X-Index-Refreshed-At"]
+                return page
+            return fetch_unowned_page(get_headers(db), limit or settings.UNOWNED_ASSETS_PAGE_SIZE, cursor)
+
+        return response_cache.serve(
+            request,
+            build_page,
+            tags=["unowned-assets"],
+            cache_control=UNOWNED_ASSETS_CACHE_CONTROL,
+            headers=lambda: freshness,
+            # A page missing some asset types must not be served again from the cache
+            cache_if=lambda page: not page["errors"],
+        )
 
-        return unowned_assets
+    refreshed_at = resolve_refreshed_at()
+    if refreshed_at is not None:
+        freshness = {"X-Index-Refreshed-At": refreshed_at.isoformat() + "Z"}
+        return StreamingResponse(stream_index(format), media_type=media_type, headers=freshness)
 
-    except requests.RequestException as e:
-        logger.error(f"Error communicating with OpenMetadata API: {str(e)}")
-        raise HTTPException(status_code=500, detail="Failed to communicate with OpenMetadata API")
+    return StreamingResponse(stream_unowned_assets(get_headers(db), format), media_type=media_type)
@@ -4,13 +4,13 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.models.user import User
-from app.models import Settings
 from app.schemas import UserLogin, UserCreate, User as UserSchema
-from app.utils import verify_password, create_access_token, get_password_hash
+from app.utils import verify_password, create_access_token, get_password_hash, get_headers
 from datetime import timedelta
 import requests
 import logging
-from app.config import settings  # Import settings for configuration
+from app.openmetadata_client import openmetadata_client
+from app.team_directory import team_directory
 
 router = APIRouter(
     prefix="/users",
@@ -20,24 +20,11 @@ router = APIRouter(
 # Configure logger
 logger = logging.getLogger(__name__)
 
-# Use settings from config.py for OpenMetadata API URL
-OPENMETADATA_API_URL = settings.OPENMETADATA_API_URL
-
-def get_headers(db: Session):
-    """Retrieve authorization headers for OpenMetadata API."""
-    settings_entry = db.query(Settings).first()
-    if not settings_entry or not settings_entry.openmetadata_token:
-        logger.error("OpenMetadata API token not configured.")
-        raise HTTPException(status_code=500, detail="OpenMetadata API token is not configured in the database")
-    return {"Authorization": f"Bearer {settings_entry.openmetadata_token}", "Content-Type": "application/json"}
-
 def check_team_in_catalog(team_name: str, db: Session) -> str:
     """Check if a team exists in OpenMetadata and return its ID if it does."""
     headers = get_headers(db)
     try:
-        response = requests.get(f"{OPENMETADATA_API_URL}/teams/name/{team_name}", headers=headers)
-        if response.status_code == 200:
-            return response.json().get("id")  # Return the team ID if it exists
+        return team_directory.get_id_by_name(team_name, headers)  # Cached team lookup
     except requests.RequestException as e:
         logger.error(f"Error checking team in catalog: {e}")
     return None
@@ -46,9 +33,11 @@ def create_team_in_catalog(team_name: str, db: Session) -> str:
     """Create a team in OpenMetadata and return the team ID."""
     headers = get_headers(db)
     payload = {"name": team_name, "displayName": team_name}
-    response = requests.post(f"{OPENMETADATA_API_URL}/teams", json=payload, headers=headers)
+    response = openmetadata_client.post("/teams", json=payload, headers=headers)
     if response.status_code == 201:
-        return response.json().get("id")  # Return the new team ID if creation is successful
+        team = response.json()
+        team_directory.remember(team)  # Replace any cached "not found" entry for this team
+        return team.get("id")  # Return the new team ID if creation is successful
     else:
         logger.error(f"Failed to create team '{team_name}': {response.text}")
         raise HTTPException(status_code=500, detail="Failed to create team in catalog")
@@ -0,0 +1,100 @@
+# app/team_directory.py
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from app.cache import TTLCache, SingleFlight
+from app.config import settings
+from app.openmetadata_client import openmetadata_client
+
+logger = logging.getLogger(__name__)
+
+# Marker stored for teams OpenMetadata reported as missing (negative caching)
+_NOT_FOUND = object()
+
+class TeamDirectory:
+    """
+    Process-wide cache of OpenMetadata teams, indexed by id and by name.
+    Missing teams are remembered for a shorter TTL, and entries close to expiry
+    are refreshed in the background while the cached value is still served.
+    """
+
+    def __init__(self, client, ttl: float, negative_ttl: float, refresh_ahead: float):
+        self.client = client
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.refresh_ahead = refresh_ahead
+        self._by_id = TTLCache(ttl=ttl)
+        self._by_name = TTLCache(ttl=ttl)
+        self._flight = SingleFlight()
+        self._refreshing = set()
+        self._refresh_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="team-refresh")
+
+    def get_by_id(self, team_id: str, headers: dict) -> dict:
+        """Return the team with the given id, or None if it does not exist."""
+        return self._lookup(self._by_id, ("id", team_id), f"/teams/{team_id}", headers)
+
+    def get_by_name(self, team_name: str, headers: dict) -> dict:
+        """Return the team with the given name, or None if it does not exist."""
+        return self._lookup(self._by_name, ("name", team_name), f"/teams/name/{team_name}", headers)
+
+    def get_id_by_name(self, team_name: str, headers: dict) -> str:
+        team = self.get_by_name(team_name, headers)
+        return team.get("id") if team else None
+
+    def remember(self, team: dict):
+        """Store a team fetched or created elsewhere, replacing any negative entry."""
+        if team.get("id"):
+            self._by_id.set(("id", team["id"]), team)
+        if team.get("name"):
+            self._by_name.set(("name", team["name"]), team)
+
+    def invalidate(self):
+        self._by_id.invalidate()
+        self._by_name.invalidate()
+
+    def _lookup(self, cache: TTLCache, key: tuple, path: str, headers: dict) -> dict:
+        entry = cache.get_entry(key)
+        if entry is not None:
+            value, remaining = entry
+            if value is not _NOT_FOUND and remaining < self.ttl * self.refresh_ahead:
+                self._schedule_refresh(cache, key, path, headers)
+            return None if value is _NOT_FOUND else value
+        return self._flight.do(key, self._load, cache, key, path, headers)
+
+    def _load(self, cache: TTLCache, key: tuple, path: str, headers: dict) -> dict:
+        response = self.client.get(path, headers=headers)
+        if response.status_code == 404:
+            logger.info(f"Team {key[0]} '{key[1]}' not found in OpenMetadata.")
+            cache.set(key, _NOT_FOUND, ttl=self.negative_ttl)
+            return None
+        response.raise_for_status()
+        team = response.json()
+        self.remember(team)
+        cache.set(key, team)
+        return team
+
+    def _schedule_refresh(self, cache: TTLCache, key: tuple, path: str, headers: dict):
+        with self._refresh_lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+        self._executor.submit(self._refresh, cache, key, path, headers)
+
+    def _refresh(self, cache: TTLCache, key: tuple, path: str, headers: dict):
+        try:
+            self._load(cache, key, path, headers)
+        except requests.RequestException as e:
+            # Keep serving the cached entry until it expires
+            logger.warning(f"Background refresh of team {key[0]} '{key[1]}' failed: {str(e)}")
+        finally:
+            with self._refresh_lock:
+                self._refreshing.discard(key)
+
+team_directory = TeamDirectory(
+    openmetadata_client,
+    ttl=settings.TEAM_CACHE_TTL,
+    negative_ttl=settings.TEAM_CACHE_NEGATIVE_TTL,
+    refresh_ahead=settings.TEAM_CACHE_REFRESH_AHEAD,
+)
@@ -0,0 +1,46 @@
+# app/token_provider.py
+import threading
+import time
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.models import Settings
+
+class OpenMetadataTokenProvider:
+    """
+    Caches the OpenMetadata token stored in the settings table.
+    The cache is dropped whenever a Settings row is written through this process,
+    and re-read after `ttl` seconds to pick up changes made by other workers.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._token = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def get_token(self, db: Session) -> str:
+        """Return the cached token, loading it from the database when stale. Returns None if unset."""
+        with self._lock:
+            if self._token and time.monotonic() - self._loaded_at < self.ttl:
+                return self._token
+
+        settings_record = db.query(Settings).first()
+        token = settings_record.openmetadata_token if settings_record else None
+        with self._lock:
+            self._token = token
+            self._loaded_at = time.monotonic()
+        return token
+
+    def invalidate(self):
+        with self._lock:
+            self._token = None
+            self._loaded_at = 0.0
+
+token_provider = OpenMetadataTokenProvider(ttl=settings.OPENMETADATA_TOKEN_CACHE_TTL)
+
+@event.listens_for(Settings, "after_insert")
+@event.listens_for(Settings, "after_update")
+@event.listens_for(Settings, "after_delete")
+def _invalidate_cached_token(mapper, connection, target):
+    token_provider.invalidate()
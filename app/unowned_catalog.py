@@ -0,0 +1,368 @@
+# app/unowned_catalog.py
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+import requests
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.database import SessionLocal
+from app.models import UnownedAsset, UnownedAssetSync
+from app.openmetadata_client import openmetadata_client, build_headers
+from app.response_cache import response_cache
+from app.token_provider import token_provider
+
+logger = logging.getLogger(__name__)
+
+# Mapping for asset types in OpenMetadata
+asset_type_map = {
+    "searchIndexes": "searchIndexes",
+    "tables": "tables",
+    "dashboards": "dashboards"
+}
+
+# OpenMetadata search index of each asset type, used to fetch only the assets changed since a refresh
+search_index_map = {
+    "searchIndexes": "search_entity_search_index",
+    "tables": "table_search_index",
+    "dashboards": "dashboard_search_index"
+}
+
+UNOWNED_ASSET_FIELDS = "owners,fullyQualifiedName,displayName,updatedAt"
+
+# Elasticsearch's default max_result_window: from + size cannot page past it
+SEARCH_MAX_RESULTS = 10000
+
+# Margin subtracted from the refresh start time when storing the watermark, to absorb
+# clock skew with OpenMetadata and assets updated while a refresh is paging through them
+WATERMARK_SAFETY_MS = 5 * 60 * 1000
+
+def to_unowned_asset(item: dict, asset_type: str) -> dict:
+    return {
+        "id": item["id"],
+        "displayName": item.get("displayName", item["name"]),
+        "updatedAt": item["updatedAt"],
+        "dataType": asset_type,
+        "fullyQualifiedName": item["fullyQualifiedName"]
+    }
+
+def iter_asset_pages(asset_type: str, headers: dict, after: str = None, include: str = None):
+    """
+    Page through the OpenMetadata listing for asset_type using its `after` cursor.
+    Yields (items, page_after, next_after) for each page, so only one page is held in memory.
+    """
+    endpoint = asset_type_map[asset_type]
+    while True:
+        params = {"fields": UNOWNED_ASSET_FIELDS, "limit": settings.UNOWNED_ASSETS_PAGE_SIZE}
+        if after:
+            params["after"] = after
+        if include:
+            params["include"] = include
+        logger.info(f"Fetching assets of type {asset_type} (after={after})")
+
+        response = openmetadata_client.get(f"/{endpoint}", params=params, headers=headers)
+        if response.status_code != 200:
+            logger.warning(f"Failed to fetch assets of type {asset_type}: {response.text}")
+            response.raise_for_status()
+
+        body = response.json()
+        next_after = body.get("paging", {}).get("after")
+        yield body.get("data", []), after, next_after
+
+        if not next_after:
+            return
+        after = next_after
+
+class SearchWindowExceeded(Exception):
+    """More assets changed than OpenMetadata search can page through."""
+
+def iter_changed_pages(asset_type: str, headers: dict, since: int):
+    """
+    Page through OpenMetadata search for the assets of asset_type updated after `since` (epoch
+    millis): live assets first, then soft-deleted ones, each marked with its `deleted` flag.
+    Raises SearchWindowExceeded before the first page of a pass that has too many matches.
+    """
+    query_filter = json.dumps({"query": {"range": {"updatedAt": {"gt": since}}}})
+    for deleted in (False, True):
+        offset = 0
+        while True:
+            params = {
+                "q": "*",
+                "index": search_index_map[asset_type],
+                "query_filter": query_filter,
+                "deleted": str(deleted).lower(),
+                "from": offset,
+                "size": settings.UNOWNED_ASSETS_PAGE_SIZE,
+                "sort_field": "updatedAt",
+                "sort_order": "asc",
+            }
+            logger.info(f"Searching {asset_type} updated after {since} (deleted={deleted}, from={offset})")
+
+            response = openmetadata_client.get("/search/query", params=params, headers=headers)
+            if response.status_code != 200:
+                logger.warning(f"Failed to search assets of type {asset_type}: {response.text}")
+                response.raise_for_status()
+
+            hits = response.json().get("hits", {})
+            total = hits.get("total", {})
+            total = total.get("value", 0) if isinstance(total, dict) else (total or 0)
+            if offset == 0 and total > SEARCH_MAX_RESULTS:
+                raise SearchWindowExceeded(f"{total} {asset_type} changed since the last refresh")
+
+            items = [{**hit["_source"], "deleted": deleted} for hit in hits.get("hits", [])]
+            if items:
+                yield items
+            offset += len(items)
+            if not items or offset >= total:
+                break
+
+def iter_unowned_pages(asset_type: str, headers: dict, after: str = None):
+    """Like iter_asset_pages, but each page only holds the assets that have no owner."""
+    for items, page_after, next_after in iter_asset_pages(asset_type, headers, after):
+        # Collect assets that have no owner
+        assets = [to_unowned_asset(item, asset_type) for item in items if not item.get("owners")]
+        yield assets, page_after, next_after
+
+def get_index_refreshed_at(db: Session) -> Optional[datetime]:
+    """Return when the least recently refreshed asset type was refreshed, or None if any type never was."""
+    states = db.query(UnownedAssetSync).filter(UnownedAssetSync.refreshed_at.isnot(None)).all()
+    if {state.data_type for state in states} != set(asset_type_map):
+        return None
+    return min(state.refreshed_at for state in states)
+
+def query_index_page(db: Session, limit: int, after_type: str = None, after_id: str = None) -> list:
+    """
+    Keyset page over the index, ordered by asset type in asset_type_map order (the order of a
+    live scan) and by id within a type. One indexed (data_type, id) range query per type.
+    """
+    types = list(asset_type_map)
+    rows = []
+    for data_type in types[types.index(after_type) if after_type is not None else 0:]:
+        query = db.query(UnownedAsset).filter(UnownedAsset.data_type == data_type)
+        if data_type == after_type:
+            query = query.filter(UnownedAsset.id > after_id)
+        rows.extend(query.order_by(UnownedAsset.id).limit(limit - len(rows)).all())
+        if len(rows) >= limit:
+            break
+    return rows
+
+def iter_index(db: Session, batch_size: int):
+    """Yield every indexed unowned asset in query_index_page order, fetched batch_size rows at a time."""
+    for data_type in asset_type_map:
+        query = db.query(UnownedAsset).filter(UnownedAsset.data_type == data_type).order_by(UnownedAsset.id)
+        yield from query.yield_per(batch_size)
+
+class UnownedAssetIndexRefresher:
+    """
+    Background thread that keeps the unowned_assets table in sync with OpenMetadata.
+    Every worker runs one, but each asset type is refreshed by one worker at a time, under a
+    lease held in its unowned_asset_sync row. A refresh asks OpenMetadata search for the assets
+    updated past the stored watermark; a periodic full resync pages through the whole listing
+    and also removes assets that were hard-deleted upstream.
+    """
+
+    def __init__(self, session_factory, interval: float, full_sync_interval: float, lease_seconds: float):
+        self.session_factory = session_factory
+        self.interval = interval
+        self.full_sync_interval = full_sync_interval
+        self.lease_seconds = lease_seconds
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._running = threading.Lock()
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="unowned-index-refresh", daemon=True)
+        self._thread.start()
+        logger.info("Unowned-asset index refresher started.")
+
+    def stop(self):
+        self._stopped.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def trigger(self):
+        """Ask the background thread to refresh now, without waiting for it."""
+        self._wake.set()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            try:
+                self.refresh()
+            except Exception:
+                logger.exception("Unowned-asset index refresh failed.")
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+    def refresh(self):
+        """
+        Refresh every asset type that is due and not being refreshed by another worker.
+        Does nothing if a refresh is already running in this worker.
+        """
+        if not self._running.acquire(blocking=False):
+            return
+        db = self.session_factory()
+        try:
+            token = token_provider.get_token(db)
+            if not token:
+                logger.warning("OpenMetadata API token is not configured; skipping unowned-asset index refresh.")
+                return
+            headers = build_headers(token)
+            for asset_type in asset_type_map:
+                if not self._acquire_lease(db, asset_type):
+                    continue
+                try:
+                    self._refresh_type(db, asset_type, headers)
+                except (requests.RequestException, SQLAlchemyError) as e:
+                    db.rollback()
+                    logger.error(f"Failed to refresh unowned-asset index for type {asset_type}: {str(e)}")
+                finally:
+                    self._release_lease(db, asset_type)
+        finally:
+            db.close()
+            self._running.release()
+
+    def _acquire_lease(self, db: Session, asset_type: str) -> bool:
+        """
+        Take the refresh of asset_type, unless another worker holds its lease or refreshed it
+        less than an interval ago. A single conditional UPDATE, so only one worker can win.
+        """
+        now = datetime.utcnow()
+        try:
+            if db.get(UnownedAssetSync, asset_type) is None:
+                db.add(UnownedAssetSync(data_type=asset_type, watermark=0))
+                try:
+                    db.commit()
+                except IntegrityError:
+                    db.rollback()  # Another worker created the row first
+            claimed = db.query(UnownedAssetSync).filter(
+                UnownedAssetSync.data_type == asset_type,
+                or_(UnownedAssetSync.lease_expires_at.is_(None), UnownedAssetSync.lease_expires_at < now),
+                or_(
+                    UnownedAssetSync.refreshed_at.is_(None),
+                    UnownedAssetSync.refreshed_at <= now - timedelta(seconds=self.interval)
+                )
+            ).update({
+                UnownedAssetSync.lease_owner: self.owner,
+                UnownedAssetSync.lease_expires_at: now + timedelta(seconds=self.lease_seconds),
+            }, synchronize_session=False)
+            db.commit()
+        except SQLAlchemyError as e:
+            db.rollback()
+            logger.error(f"Failed to take the unowned-asset refresh lease for type {asset_type}: {str(e)}")
+            return False
+        return claimed == 1
+
+    def _release_lease(self, db: Session, asset_type: str):
+        try:
+            db.query(UnownedAssetSync).filter(
+                UnownedAssetSync.data_type == asset_type,
+                UnownedAssetSync.lease_owner == self.owner
+            ).update({UnownedAssetSync.lease_owner: None, UnownedAssetSync.lease_expires_at: None}, synchronize_session=False)
+            db.commit()
+        except SQLAlchemyError as e:
+            db.rollback()
+            # The lease runs out on its own
+            logger.error(f"Failed to release the unowned-asset refresh lease for type {asset_type}: {str(e)}")
+
+    def _refresh_type(self, db: Session, asset_type: str, headers: dict):
+        # Whole seconds, so the sweep comparison is not affected by DATETIME precision
+        run_started = datetime.utcnow().replace(microsecond=0)
+        run_started_ms = int(time.time() * 1000)
+
+        state = db.get(UnownedAssetSync, asset_type)
+        full_sync = (
+            state.full_synced_at is None
+            or (run_started - state.full_synced_at).total_seconds() >= self.full_sync_interval
+        )
+        watermark = 0 if full_sync else (state.watermark or 0)
+
+        # include=all so soft-deleted assets show up and can be removed from the index
+        listing = (items for items, _, _ in iter_asset_pages(asset_type, headers, include="all"))
+        if full_sync:
+            applied = self._apply_pages(db, asset_type, listing, watermark, run_started)
+        else:
+            try:
+                applied = self._apply_pages(db, asset_type, iter_changed_pages(asset_type, headers, watermark), watermark, run_started)
+            except SearchWindowExceeded as e:
+                logger.info(f"{str(e)}; scanning the {asset_type} listing instead.")
+                applied = self._apply_pages(db, asset_type, listing, watermark, run_started)
+
+        if full_sync:
+            # Rows not written by this full pass no longer exist upstream
+            swept = db.query(UnownedAsset).filter(
+                UnownedAsset.data_type == asset_type,
+                UnownedAsset.synced_at < run_started
+            ).delete(synchronize_session=False)
+            state.full_synced_at = run_started
+            logger.info(f"Full resync of {asset_type} removed {swept} stale index rows.")
+
+        state.watermark = run_started_ms - WATERMARK_SAFETY_MS
+        state.refreshed_at = run_started
+        db.commit()
+        # Cached pages carry the old refresh time even when no asset changed
+        response_cache.invalidate_tags("unowned-assets")
+        logger.info(f"Unowned-asset index refreshed for {asset_type}: {applied} changed assets applied.")
+
+    def _apply_pages(self, db: Session, asset_type: str, pages, watermark: int, run_started: datetime) -> int:
+        applied = 0
+        for items in pages:
+            changed = [item for item in items if (item.get("updatedAt") or 0) > watermark]
+            if changed:
+                self._apply_page(db, asset_type, changed, run_started)
+                applied += len(changed)
+        return applied
+
+    def _apply_page(self, db: Session, asset_type: str, items: list, run_started: datetime, retry: bool = True):
+        """Upsert or delete the index rows of one page of assets in one transaction, renewing the lease."""
+        existing = {
+            row.id: row
+            for row in db.query(UnownedAsset).filter(UnownedAsset.id.in_([item["id"] for item in items]))
+        }
+        for item in items:
+            row = existing.get(item["id"])
+            if item.get("owners") or item.get("deleted"):
+                if row is not None:
+                    db.delete(row)
+                continue
+            if row is None:
+                row = UnownedAsset(id=item["id"])
+                db.add(row)
+            asset = to_unowned_asset(item, asset_type)
+            row.data_type = asset_type
+            row.display_name = asset["displayName"]
+            row.fully_qualified_name = asset["fullyQualifiedName"]
+            row.updated_at = asset["updatedAt"]
+            row.synced_at = run_started
+        db.query(UnownedAssetSync).filter(
+            UnownedAssetSync.data_type == asset_type,
+            UnownedAssetSync.lease_owner == self.owner
+        ).update({UnownedAssetSync.lease_expires_at: datetime.utcnow() + timedelta(seconds=self.lease_seconds)}, synchronize_session=False)
+        try:
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            if not retry:
+                raise
+            # Rows inserted meanwhile, e.g. by a worker that took over an expired lease; update them instead
+            logger.info(f"Concurrent insert while refreshing the {asset_type} index; retrying the page.")
+            self._apply_page(db, asset_type, items, run_started, retry=False)
+
+unowned_index_refresher = UnownedAssetIndexRefresher(
+    SessionLocal,
+    interval=settings.UNOWNED_ASSETS_REFRESH_INTERVAL,
+    full_sync_interval=settings.UNOWNED_ASSETS_FULL_SYNC_INTERVAL,
+    lease_seconds=settings.UNOWNED_ASSETS_REFRESH_LEASE,
+)
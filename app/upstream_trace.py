@@ -0,0 +1,99 @@
+# app/upstream_trace.py
+import bisect
+import contextvars
+import threading
+from typing import List, Optional
+from app.metrics import register_metrics
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is unbounded
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+# Most endpoint series kept in the latency histograms; calls to further endpoints share the "other" series
+MAX_ENDPOINT_SERIES = 200
+
+# Fixed path segments that may follow an entity collection; any other segment there is an id or a name
+_STATIC_SEGMENTS = {"name", "versions", "followers", "votes", "restore", "history"}
+
+def endpoint_template(path: str) -> str:
+    """
+    Collapse ids and names in an API path, e.g. /teams/name/data-eng -> /teams/name/{name} and
+    /tables/<anything> -> /tables/{id}. The first segment is the collection (the first two under
+    /services), so the number of distinct templates stays bounded whatever the callers pass in.
+    """
+    segments = path.split("?", 1)[0].strip("/").split("/")
+    fixed = 2 if segments[0] == "services" else 1
+    for index in range(fixed, len(segments)):
+        if segments[index - 1] == "name":
+            segments[index] = "{name}"
+        elif segments[index] not in _STATIC_SEGMENTS:
+            segments[index] = "{id}"
+    return "/" + "/".join(segments)
+
+class RequestTrace:
+    """Upstream calls made while serving one request; calls may be recorded from worker threads."""
+
+    def __init__(self):
+        self.calls: List[dict] = []
+        self._lock = threading.Lock()
+
+    def record(self, method: str, endpoint: str, status: Optional[int], duration_ms: float):
+        with self._lock:
+            self.calls.append({"method": method, "endpoint": endpoint, "status": status, "duration_ms": duration_ms})
+
+    def totals(self) -> tuple:
+        """Return (number of calls, summed duration in ms)."""
+        with self._lock:
+            return len(self.calls), sum(call["duration_ms"] for call in self.calls)
+
+current_trace: contextvars.ContextVar[Optional[RequestTrace]] = contextvars.ContextVar("upstream_trace", default=None)
+
+def submit_in_context(executor, fn, *args, **kwargs):
+    """executor.submit() that runs fn in a copy of the caller's context, so its calls land in the caller's trace."""
+    return executor.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+class LatencyHistograms:
+    """Cumulative per-endpoint latency histograms of upstream calls."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS_MS, max_series: int = MAX_ENDPOINT_SERIES):
+        self.buckets = buckets
+        self.max_series = max_series
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, method: str, endpoint: str, status: Optional[int], duration_ms: float):
+        key = f"{method} {endpoint}"
+        with self._lock:
+            if key not in self._series and len(self._series) >= self.max_series:
+                key = "other"
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {"count": 0, "errors": 0, "sum_ms": 0.0, "counts": [0] * (len(self.buckets) + 1)}
+            series["count"] += 1
+            series["sum_ms"] += duration_ms
+            if status is None or status >= 500:
+                series["errors"] += 1
+            series["counts"][bisect.bisect_left(self.buckets, duration_ms)] += 1
+
+    def snapshot(self) -> dict:
+        labels = [f"le_{bound}" for bound in self.buckets] + ["le_inf"]
+        with self._lock:
+            return {
+                key: {
+                    "count": series["count"],
+                    "errors": series["errors"],
+                    "avg_ms": series["sum_ms"] / series["count"],
+                    "buckets": dict(zip(labels, series["counts"])),
+                }
+                for key, series in self._series.items()
+            }
+
+upstream_latency = LatencyHistograms()
+register_metrics("upstream_latency", upstream_latency.snapshot)
+
+def record_upstream_call(method: str, path: str, status: Optional[int], duration_ms: float):
+    """Add a call to the current request's trace (if any) and to the latency histograms."""
+    endpoint = endpoint_template(path)
+    trace = current_trace.get()
+    if trace is not None:
+        trace.record(method, endpoint, status, duration_ms)
+    upstream_latency.observe(method, endpoint, status, duration_ms)
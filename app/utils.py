@@ -5,12 +5,17 @@ import requests
 from fastapi import Depends, HTTPException
 from sqlalchemy.orm import Session
 from app.database import get_db
-from app.models import Settings, User
+from app.models import User
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi.security import OAuth2PasswordBearer
 from datetime import datetime, timedelta
 from app.config import settings  # Import settings for configuration
+from app.openmetadata_client import openmetadata_client, build_headers
+from app.cache import TTLCache, SingleFlight
+from app.team_directory import team_directory
+from app.token_provider import token_provider
+from app.principal_cache import principal_cache, UserSnapshot
 
 logger = logging.getLogger(__name__)
 
@@ -24,6 +29,10 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
+# Resolved service/database/schema entities keyed by (entity type, FQN)
+hierarchy_cache = TTLCache(ttl=settings.HIERARCHY_CACHE_TTL, maxsize=settings.HIERARCHY_CACHE_MAXSIZE)
+_hierarchy_flight = SingleFlight()
+
 def get_password_hash(password: str) -> str:
     """Hash a plaintext password."""
     return pwd_context.hash(password)
@@ -40,8 +49,15 @@ def create_access_token(data: dict, expires_delta: timedelta = None) -> str:
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
-    """Retrieve the current user based on the token."""
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> UserSnapshot:
+    """
+    Retrieve the current user based on the token.
+    Verified tokens are cached briefly, so hot paths skip both JWT decoding and the user query.
+    """
+    cached_user = principal_cache.get(token)
+    if cached_user is not None:
+        return cached_user
+
     credentials_exception = HTTPException(
         status_code=401,
         detail="Could not validate credentials",
@@ -54,16 +70,18 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
         user = db.query(User).filter(User.username == username).first()
         if user is None:
             raise credentials_exception
-        return user
+        snapshot = UserSnapshot.from_user(user)
+        principal_cache.put(token, snapshot, payload.get("exp"))
+        return snapshot
     except JWTError as e:
         logger.error(f"JWT Error: {str(e)}")
         raise credentials_exception
 
 def get_openmetadata_token(db: Session):
-    """Retrieve OpenMetadata token from the database settings."""
-    settings_record = db.query(Settings).first()
-    if settings_record and settings_record.openmetadata_token:
-        return settings_record.openmetadata_token
+    """Retrieve OpenMetadata token from the database settings (cached in memory)."""
+    token = token_provider.get_token(db)
+    if token:
+        return token
     logger.error("OpenMetadata API token not found in the database.")
     raise HTTPException(status_code=500, detail="OpenMetadata API token is not configured in the database")
 
@@ -72,15 +90,57 @@ def get_headers(db: Session) -> dict:
     token = get_openmetadata_token(db)
     if not token:
         raise HTTPException(status_code=500, detail="OpenMetadata API token is not configured.")
-    return {
-        "Authorization": f"Bearer {token}",
-        "Content-Type": "application/json"
-    }
+    return build_headers(token)
+
+def _resolve_hierarchy_entity(key: tuple, loader, *args) -> dict:
+    """
+    Return a hierarchy entity from the cache, or load it with loader.
+    Concurrent misses for the same key share a single upstream lookup/create.
+    """
+    entity = hierarchy_cache.get(key)
+    if entity is not None:
+        return entity
+
+    def load():
+        # A previous leader may have filled the cache while we were waiting
+        cached = hierarchy_cache.get(key)
+        if cached is not None:
+            return cached
+        result = loader(*args)
+        if result and "error" not in result:
+            hierarchy_cache.set(key, result)
+        return result
+
+    return _hierarchy_flight.do(key, load)
+
+def invalidate_hierarchy_cache(fqn: str = None):
+    """Drop the cached entity for fqn and its children, or the whole cache when fqn is None."""
+    if fqn is None:
+        hierarchy_cache.invalidate()
+        return
+    hierarchy_cache.invalidate_matching(lambda key, _: key[1] == fqn or key[1].startswith(f"{fqn}."))
 
 def get_or_create_database_service(name: str, headers: dict) -> dict:
+    """Retrieve or create the database service by name, using the hierarchy cache."""
+    return _resolve_hierarchy_entity(("databaseService", name), _get_or_create_database_service, name, headers)
+
+def get_or_create_database(name: str, service_name: str, headers: dict) -> dict:
+    """Retrieve or create a database under the given service, using the hierarchy cache."""
+    return _resolve_hierarchy_entity(
+        ("database", f"{service_name}.{name}"), _get_or_create_database, name, service_name, headers
+    )
+
+def get_or_create_schema(name: str, service_name: str, database_name: str, headers: dict) -> dict:
+    """Retrieve or create a database schema under the given database, using the hierarchy cache."""
+    return _resolve_hierarchy_entity(
+        ("databaseSchema", f"{service_name}.{database_name}.{name}"),
+        _get_or_create_schema, name, service_name, database_name, headers
+    )
+
+def _get_or_create_database_service(name: str, headers: dict) -> dict:
     """Retrieve or create the database service by name."""
     try:
-        response = requests.get(f"{settings.OPENMETADATA_API_URL}/services/databaseServices/name/{name}", headers=headers)
+        response = openmetadata_client.get(f"/services/databaseServices/name/{name}", headers=headers)
         if response.status_code == 200:
             logger.info(f"Database service '{name}' found.")
             return response.json()
@@ -90,7 +150,7 @@ def get_or_create_database_service(name: str, headers: dict) -> dict:
                 "serviceType": "CustomDatabase",
                 "name": name
             }
-            response = requests.post(f"{settings.OPENMETADATA_API_URL}/services/databaseServices", json=payload, headers=headers)
+            response = openmetadata_client.post("/services/databaseServices", json=payload, headers=headers)
             response.raise_for_status()
             logger.info(f"Database service '{name}' created successfully.")
             return response.json()
@@ -98,11 +158,11 @@ def get_or_create_database_service(name: str, headers: dict) -> dict:
         logger.error(f"Exception while creating database service '{name}': {str(e)}")
         return {"error": str(e)}
 
-def get_or_create_database(name: str, service_name: str, headers: dict) -> dict:
+def _get_or_create_database(name: str, service_name: str, headers: dict) -> dict:
     """Retrieve or create a database under the given service."""
     try:
         database_fqn = f"{service_name}.{name}"
-        response = requests.get(f"{settings.OPENMETADATA_API_URL}/databases/name/{database_fqn}", headers=headers)
+        response = openmetadata_client.get(f"/databases/name/{database_fqn}", headers=headers)
 
         if response.status_code == 200:
             logger.info(f"Database '{name}' found under service '{service_name}'.")
@@ -115,7 +175,7 @@ def get_or_create_database(name: str, service_name: str, headers: dict) -> dict:
                 "id": service_name
             }
         }
-        response = requests.post(f"{settings.OPENMETADATA_API_URL}/databases", json=payload, headers=headers)
+        response = openmetadata_client.post("/databases", json=payload, headers=headers)
 
         response_data = response.json() if response.status_code in [200, 201] else {"error": response.text}
         if response.status_code in [200, 201]:
@@ -129,11 +189,11 @@ def get_or_create_database(name: str, service_name: str, headers: dict) -> dict:
         logger.error(error_msg)
         return {"error": error_msg}
 
-def get_or_create_schema(name: str, service_name: str, database_name: str, headers: dict) -> dict:
+def _get_or_create_schema(name: str, service_name: str, database_name: str, headers: dict) -> dict:
     """Retrieve or create a database schema under the given database."""
     try:
         schema_fqn = f"{service_name}.{database_name}.{name}"
-        response = requests.get(f"{settings.OPENMETADATA_API_URL}/databaseSchemas/name/{schema_fqn}", headers=headers)
+        response = openmetadata_client.get(f"/databaseSchemas/name/{schema_fqn}", headers=headers)
 
         if response.status_code == 200:
             logger.info(f"Database schema '{name}' found under database '{database_name}'.")
@@ -146,7 +206,7 @@ def get_or_create_schema(name: str, service_name: str, database_name: str, heade
                 "id": f"{service_name}.{database_name}"
             }
         }
-        response = requests.post(f"{settings.OPENMETADATA_API_URL}/databaseSchemas", json=payload, headers=headers)
+        response = openmetadata_client.post("/databaseSchemas", json=payload, headers=headers)
 
         response_data = response.json() if response.status_code in [200, 201] else {"error": response.text}
         if response.status_code in [200, 201]:
@@ -161,12 +221,9 @@ def get_or_create_schema(name: str, service_name: str, database_name: str, heade
         return {"error": error_msg}
 
 def get_team_details(team_id: str, headers: dict) -> dict:
-    """Retrieve team details by team ID."""
+    """Retrieve team details by team ID, using the team directory cache."""
     try:
-        response = requests.get(f"{settings.OPENMETADATA_API_URL}/teams/{team_id}", headers=headers)
-        response.raise_for_status()
-        team = response.json()
-        return team
+        return team_directory.get_by_id(team_id, headers)
     except requests.exceptions.RequestException as e:
         logger.error(f"Error retrieving team details for team_id '{team_id}': {str(e)}")
         return None
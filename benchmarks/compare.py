@@ -0,0 +1,54 @@
+# benchmarks/compare.py
+"""
+Compare two reports written by benchmarks/run.py.
+
+    python -m benchmarks.compare baseline.json candidate.json
+"""
+import json
+import sys
+
+# Metric path -> True when a higher value is better
+METRICS = {
+    ("throughput_rps",): True,
+    ("latency_ms", "p50"): False,
+    ("latency_ms", "p99"): False,
+    ("upstream_calls",): False,
+    ("peak_rss_mb",): False,
+}
+
+def lookup(result: dict, path: tuple):
+    for key in path:
+        if not isinstance(result, dict) or key not in result:
+            return None
+        result = result[key]
+    return result
+
+def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 2:
+        print(__doc__.strip(), file=sys.stderr)
+        return 2
+    with open(argv[0], encoding="utf-8") as handle:
+        baseline = json.load(handle)
+    with open(argv[1], encoding="utf-8") as handle:
+        candidate = json.load(handle)
+
+    print(f"baseline {baseline['meta']['revision']} -> candidate {candidate['meta']['revision']}")
+    for scenario in sorted(set(baseline["scenarios"]) | set(candidate["scenarios"])):
+        before = baseline["scenarios"].get(scenario, {})
+        after = candidate["scenarios"].get(scenario, {})
+        print(scenario)
+        for path, higher_is_better in METRICS.items():
+            old, new = lookup(before, path), lookup(after, path)
+            if old is None and new is None:
+                continue
+            change = ""
+            if old and new is not None:
+                delta = (new - old) / old * 100
+                better = delta > 0 if higher_is_better else delta < 0
+                change = f"{delta:+.1f}%{'' if abs(delta) < 5 else (' better' if better else ' worse')}"
+            print(f"  {'.'.join(path):<16} {old!s:>12} -> {new!s:<12} {change}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,325 @@
+# benchmarks/fake_openmetadata.py
+"""
+In-process stand-in for the OpenMetadata API, serving just the endpoints this service calls.
+
+The catalog is synthetic: entity i of each type is built on demand from its index, so a
+100k-entity catalog costs no memory until entities are created or patched. Every response
+can be delayed by a fixed latency plus jitter, and calls are counted per endpoint.
+"""
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+ENTITY_TYPES = ("tables", "dashboards", "searchIndexes")
+TEAM_ID = "83f9c0ed-14b5-4c42-a22b-f60f83eef400"
+UPDATED_AT_BASE = 1_700_000_000_000
+SEARCH_INDEXES = {
+    "table_search_index": "tables",
+    "dashboard_search_index": "dashboards",
+    "search_entity_search_index": "searchIndexes",
+}
+
+class FakeCatalog:
+    """Synthetic entities plus the entities created or modified during a run."""
+
+    def __init__(self, catalog_size: int, owned_every: int, team_size: int, columns: int, description_bytes: int):
+        self.sizes = {
+            "tables": catalog_size,
+            "dashboards": max(1, catalog_size // 20),
+            "searchIndexes": max(1, catalog_size // 20),
+        }
+        self.owned_every = owned_every
+        self.team_size = team_size
+        self.columns = columns
+        self.description = "x" * description_bytes
+        self.overrides = {}  # (type, index) -> entity modified by a PATCH
+        self.created = {}  # fullyQualifiedName -> entity created by POST/PUT
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def entity_id(entity_type: str, index: int) -> str:
+        # The index is encoded in the id, so lookups by id need no table
+        return f"{ENTITY_TYPES.index(entity_type):08d}-0000-4000-8000-{index:012d}"
+
+    @staticmethod
+    def parse_id(entity_id: str):
+        parts = entity_id.split("-")
+        if len(parts) != 5 or parts[1:4] != ["0000", "4000", "8000"]:
+            return None
+        try:
+            return ENTITY_TYPES[int(parts[0])], int(parts[4])
+        except (ValueError, IndexError):
+            return None
+
+    def is_owned(self, index: int) -> bool:
+        return self.owned_every > 0 and index % self.owned_every == 0
+
+    def entity(self, entity_type: str, index: int) -> dict:
+        with self.lock:
+            override = self.overrides.get((entity_type, index))
+        if override is not None:
+            return override
+        name = f"{entity_type}_{index}"
+        entity = {
+            "id": self.entity_id(entity_type, index),
+            "name": name,
+            "displayName": f"{entity_type.capitalize()} {index}",
+            "fullyQualifiedName": f"bench_service.bench_db.bench_schema.{name}",
+            "description": self.description,
+            "version": 0.1,
+            "updatedAt": UPDATED_AT_BASE + index,
+            "owners": [{"id": TEAM_ID, "type": "team", "name": "best1"}] if self.is_owned(index) else [],
+            "tags": [],
+        }
+        if entity_type == "tables":
+            entity["columns"] = [
+                {"name": f"column_{c}", "dataType": "VARCHAR", "description": self.description}
+                for c in range(self.columns)
+            ]
+        return entity
+
+    def updated_since(self, entity_type: str, since: int) -> list:
+        """Entities of entity_type with updatedAt past `since`, oldest first."""
+        indexes = set(range(max(0, since - UPDATED_AT_BASE + 1), self.sizes[entity_type]))
+        with self.lock:
+            indexes.update(index for (kind, index), entity in self.overrides.items() if kind == entity_type and entity["updatedAt"] > since)
+        entities = [self.entity(entity_type, index) for index in sorted(indexes)]
+        return sorted((entity for entity in entities if entity["updatedAt"] > since), key=lambda entity: entity["updatedAt"])
+
+    def owned_references(self) -> list:
+        """Entity references returned in a team's `owns` field."""
+        references = []
+        index = 0
+        while len(references) < self.team_size and index < self.sizes["tables"]:
+            if self.is_owned(index):
+                entity = self.entity("tables", index)
+                references.append({
+                    "id": entity["id"],
+                    "type": "table",
+                    "name": entity["name"],
+                    "displayName": entity["displayName"],
+                    "description": entity["description"],
+                    "updatedAt": entity["updatedAt"],
+                })
+            index += 1
+        return references
+
+    def patch(self, entity_type: str, index: int, operations: list) -> dict:
+        entity = json.loads(json.dumps(self.entity(entity_type, index)))
+        for operation in operations:
+            field = operation.get("path", "").strip("/")
+            if operation.get("op") in ("replace", "add") and "/" not in field:
+                entity[field] = operation.get("value")
+        entity["version"] = round(entity["version"] + 0.1, 1)
+        entity["updatedAt"] = int(time.time() * 1000)
+        with self.lock:
+            self.overrides[(entity_type, index)] = entity
+        return entity
+
+class FakeOpenMetadataServer:
+    """Threaded HTTP server exposing a FakeCatalog under /api/v1, with configurable latency."""
+
+    def __init__(self, catalog: FakeCatalog, latency_ms: float = 0.0, jitter_ms: float = 0.0, host: str = "127.0.0.1"):
+        self.catalog = catalog
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.calls = Counter()
+        self._calls_lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, 0), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/api/v1"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-openmetadata", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def snapshot_calls(self) -> Counter:
+        with self._calls_lock:
+            return Counter(self.calls)
+
+    def count(self, endpoint: str):
+        with self._calls_lock:
+            self.calls[endpoint] += 1
+
+    def delay(self):
+        delay_ms = self.latency_ms + (random.uniform(0, self.jitter_ms) if self.jitter_ms else 0.0)
+        if delay_ms > 0:
+            time.sleep(delay_ms / 1000)
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # Keep-alive, like the real API behind a load balancer
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status: int, body=None, headers: dict = None):
+                payload = json.dumps(body).encode("utf-8") if body is not None else b""
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def _body(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                return json.loads(self.rfile.read(length)) if length else None
+
+            def _route(self, method: str):
+                parsed = urlparse(self.path)
+                path = parsed.path.removeprefix("/api/v1")
+                query = {key: values[-1] for key, values in parse_qs(parsed.query).items()}
+                body = self._body() if method in ("POST", "PUT", "PATCH") else None
+                server.delay()
+                for pattern, template, handler in ROUTES.get(method, ()):
+                    match = pattern.fullmatch(path)
+                    if match:
+                        server.count(f"{method} {template}")
+                        status, payload, headers = handler(server.catalog, self, query, body, *match.groups())
+                        return self._send(status, payload, headers)
+                server.count(f"{method} <unmatched>")
+                self._send(404, {"code": 404, "message": f"No route for {method} {path}"})
+
+            def do_GET(self):
+                self._route("GET")
+
+            def do_POST(self):
+                self._route("POST")
+
+            def do_PUT(self):
+                self._route("PUT")
+
+            def do_PATCH(self):
+                self._route("PATCH")
+
+        return Handler
+
+def _list_entities(catalog: FakeCatalog, request, query: dict, body, entity_type: str):
+    if entity_type not in catalog.sizes:
+        return 404, {"code": 404, "message": f"Unknown entity type {entity_type}"}, None
+    limit = int(query.get("limit", 10))
+    start = int(query.get("after") or 0)
+    end = min(start + limit, catalog.sizes[entity_type])
+    data = [catalog.entity(entity_type, index) for index in range(start, end)]
+    paging = {"total": catalog.sizes[entity_type]}
+    if end < catalog.sizes[entity_type]:
+        paging["after"] = str(end)
+    return 200, {"data": data, "paging": paging}, None
+
+def _search(catalog: FakeCatalog, request, query: dict, body):
+    entity_type = SEARCH_INDEXES.get(query.get("index"))
+    if entity_type is None:
+        return 400, {"code": 400, "message": f"Unknown search index {query.get('index')}"}, None
+    query_filter = json.loads(query.get("query_filter") or "{}")
+    since = query_filter.get("query", {}).get("range", {}).get("updatedAt", {}).get("gt", 0)
+    # Nothing is ever soft-deleted in the fake catalog
+    matches = [] if query.get("deleted") == "true" else catalog.updated_since(entity_type, since)
+    start = int(query.get("from", 0))
+    size = int(query.get("size", 10))
+    hits = [{"_source": entity} for entity in matches[start:start + size]]
+    return 200, {"hits": {"total": {"value": len(matches)}, "hits": hits}}, None
+
+def _get_entity(catalog: FakeCatalog, request, query: dict, body, entity_type: str, entity_id: str):
+    parsed = FakeCatalog.parse_id(entity_id)
+    if parsed is None or parsed[0] != entity_type or parsed[1] >= catalog.sizes.get(entity_type, 0):
+        return 404, {"code": 404, "message": f"{entity_type} instance for {entity_id} not found"}, None
+    entity = catalog.entity(*parsed)
+    etag = f'"{entity["version"]}"'
+    if request.headers.get("If-None-Match") == etag:
+        return 304, None, {"ETag": etag}
+    return 200, entity, {"ETag": etag}
+
+def _patch_entity(catalog: FakeCatalog, request, query: dict, body, entity_type: str, entity_id: str):
+    parsed = FakeCatalog.parse_id(entity_id)
+    if parsed is None or parsed[0] != entity_type:
+        return 404, {"code": 404, "message": f"{entity_type} instance for {entity_id} not found"}, None
+    current = catalog.entity(*parsed)
+    if_match = request.headers.get("If-Match")
+    if if_match is not None and if_match.strip('"') != str(current["version"]):
+        return 412, {"code": 412, "message": "Entity version does not match If-Match"}, None
+    return 200, catalog.patch(*parsed, body or []), None
+
+def _get_team(catalog: FakeCatalog, request, query: dict, body, name: str):
+    team = {"id": TEAM_ID, "name": name, "displayName": name, "version": 0.1}
+    if "owns" in query.get("fields", ""):
+        team["owns"] = catalog.owned_references()
+    return 200, team, None
+
+def _get_team_by_id(catalog: FakeCatalog, request, query: dict, body, team_id: str):
+    return 200, {"id": team_id, "name": "best1", "displayName": "best1", "version": 0.1}, None
+
+def _create_team(catalog: FakeCatalog, request, query: dict, body):
+    return 201, {"id": str(uuid.uuid4()), **(body or {})}, None
+
+def _get_by_name(catalog: FakeCatalog, request, query: dict, body, fqn: str):
+    # Services, databases and schemas always exist, as in a populated deployment
+    return 200, {"id": str(uuid.uuid5(uuid.NAMESPACE_URL, fqn)), "name": fqn.split(".")[-1], "fullyQualifiedName": fqn}, None
+
+def _create_parent(catalog: FakeCatalog, request, query: dict, body):
+    name = (body or {}).get("name", "unnamed")
+    return 201, {"id": str(uuid.uuid5(uuid.NAMESPACE_URL, name)), **(body or {})}, None
+
+def _get_table_by_name(catalog: FakeCatalog, request, query: dict, body, fqn: str):
+    with catalog.lock:
+        table = catalog.created.get(fqn)
+    if table is None:
+        return 404, {"code": 404, "message": f"table instance for {fqn} not found"}, None
+    return 200, table, None
+
+def _store_table(catalog: FakeCatalog, request, query: dict, body):
+    fqn = f"{body['databaseSchema']}.{body['name']}"
+    with catalog.lock:
+        existing = catalog.created.get(fqn)
+        table = {
+            **(body or {}),
+            "id": existing["id"] if existing else str(uuid.uuid4()),
+            "fullyQualifiedName": fqn,
+            "version": round(existing["version"] + 0.1, 1) if existing else 0.1,
+        }
+        catalog.created[fqn] = table
+    return (200 if existing else 201), table, None
+
+def _compile(routes):
+    compiled = {}
+    for method, template, handler in routes:
+        pattern = re.compile(re.sub(r"\{[^}]+\}", "([^/]+)", template))
+        compiled.setdefault(method, []).append((pattern, template, handler))
+    return compiled
+
+ROUTES = _compile([
+    ("GET", "/teams/name/{name}", _get_team),
+    ("GET", "/teams/{id}", _get_team_by_id),
+    ("POST", "/teams", _create_team),
+    ("GET", "/services/databaseServices/name/{fqn}", _get_by_name),
+    ("POST", "/services/databaseServices", _create_parent),
+    ("GET", "/databases/name/{fqn}", _get_by_name),
+    ("POST", "/databases", _create_parent),
+    ("GET", "/databaseSchemas/name/{fqn}", _get_by_name),
+    ("POST", "/databaseSchemas", _create_parent),
+    ("GET", "/tables/name/{fqn}", _get_table_by_name),
+    ("POST", "/tables", _store_table),
+    ("PUT", "/tables", _store_table),
+    ("GET", "/search/query", _search),
+    ("GET", "/{type}", _list_entities),
+    ("GET", "/{type}/{id}", _get_entity),
+    ("PATCH", "/{type}/{id}", _patch_entity),
+])
@@ -0,0 +1,26 @@
+"""metadata history asset/created_at index
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 09:12:04.518223
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_metadata_histories_asset_id_created_at', 'metadata_histories', ['asset_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_metadata_histories_asset_id_created_at', table_name='metadata_histories')
@@ -0,0 +1,34 @@
+"""ingested table fingerprints
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 14:05:37.902114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('ingested_table_fingerprints',
+    sa.Column('fully_qualified_name', sa.String(length=512), nullable=False),
+    sa.Column('fingerprint', sa.String(length=64), nullable=False),
+    sa.Column('table_id', sa.String(length=255), nullable=True),
+    sa.Column('ingested_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('fully_qualified_name')
+    )
+    op.create_index(op.f('ix_ingested_table_fingerprints_table_id'), 'ingested_table_fingerprints', ['table_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_ingested_table_fingerprints_table_id'), table_name='ingested_table_fingerprints')
+    op.drop_table('ingested_table_fingerprints')
@@ -0,0 +1,38 @@
+"""regeneration jobs
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 16:21:48.330518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('regeneration_jobs',
+    sa.Column('id', sa.String(length=32), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('item_counts', sa.Text(), nullable=True),
+    sa.Column('results', sa.Text(length=4294967295), nullable=True),
+    sa.Column('owner', sa.String(length=255), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_regeneration_jobs_finished_at', 'regeneration_jobs', ['finished_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_regeneration_jobs_finished_at', table_name='regeneration_jobs')
+    op.drop_table('regeneration_jobs')
@@ -0,0 +1,29 @@
+"""unowned asset sync lease
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 19:02:11.406733
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('unowned_asset_sync', sa.Column('lease_owner', sa.String(length=255), nullable=True))
+    op.add_column('unowned_asset_sync', sa.Column('lease_expires_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('unowned_asset_sync') as batch_op:
+        batch_op.drop_column('lease_expires_at')
+        batch_op.drop_column('lease_owner')
@@ -0,0 +1,87 @@
+# tests/test_event_loop.py
+"""
+A slow OpenMetadata call must not stall the other requests served by the same worker.
+
+The app runs under uvicorn against benchmarks/fake_openmetadata.py, whose every response
+is delayed by UPSTREAM_LATENCY_S; requests that never call upstream must still be answered
+while a slow one is waiting on it.
+"""
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+import pytest
+import requests
+from benchmarks.fake_openmetadata import FakeCatalog, FakeOpenMetadataServer
+from benchmarks.run import configure_environment, start_app
+
+UPSTREAM_LATENCY_S = 2.0
+
+@pytest.fixture(scope="module")
+def live_app():
+    upstream = FakeOpenMetadataServer(
+        FakeCatalog(catalog_size=10, owned_every=2, team_size=5, columns=3, description_bytes=16),
+        latency_ms=UPSTREAM_LATENCY_S * 1000,
+    )
+    upstream.start()
+    with tempfile.TemporaryDirectory() as workdir:
+        configure_environment(SimpleNamespace(database_url=None), upstream.url, workdir)
+        server, base_url = start_app()
+        try:
+            yield base_url
+        finally:
+            server.should_exit = True
+            upstream.stop()
+
+@pytest.fixture(scope="module")
+def auth_headers(live_app):
+    response = requests.post(f"{live_app}/api/v1/users/login", json={"username": "admin", "password": "123"}, timeout=30)
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+def slow_batch_update(base_url: str, headers: dict) -> requests.Response:
+    # async route: reads then PATCHes the asset upstream, two delayed calls
+    return requests.patch(
+        f"{base_url}/api/v1/metadata/update",
+        json=[{
+            "assetId": FakeCatalog.entity_id("tables", 1),
+            "displayName": "Updated while another request waits",
+            "description": "",
+            "attributes": [],
+            "tag": "",
+        }],
+        timeout=30,
+    )
+
+def slow_suggestions(base_url: str, headers: dict) -> requests.Response:
+    # sync route: one delayed read
+    return requests.get(f"{base_url}/api/v1/metadata/suggestions/{FakeCatalog.entity_id('tables', 2)}", timeout=30)
+
+def slow_upload(base_url: str, headers: dict) -> requests.Response:
+    # bulk route: resolves the service, database and schema, then writes the table, all delayed
+    return requests.post(
+        f"{base_url}/api/v1/assets/upload_assets",
+        json=[{
+            "title": "Uploaded while another request waits",
+            "description": "",
+            "attributes": ["column_0"],
+            "att_desc": ["Column 0"],
+        }],
+        headers=headers,
+        timeout=60,
+    )
+
+@pytest.mark.parametrize("slow_request", [slow_batch_update, slow_suggestions, slow_upload])
+def test_other_requests_are_served_while_an_upstream_call_is_slow(live_app, auth_headers, slow_request):
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        slow = pool.submit(slow_request, live_app, auth_headers)
+        time.sleep(0.2)  # Let the slow request reach OpenMetadata
+
+        started = time.monotonic()
+        fast = requests.get(f"{live_app}/api/v1/metrics/", timeout=30)
+        elapsed = time.monotonic() - started
+
+        assert fast.status_code == 200
+        assert not slow.done()
+        assert elapsed < UPSTREAM_LATENCY_S / 4
+        assert slow.result().status_code == 200